@@ -1,7 +1,10 @@
 """Configuration module for OPD Token System"""
 import os
+from enum import IntEnum
+from operator import itemgetter
+from types import MappingProxyType
 from pydantic_settings import BaseSettings
-from typing import Dict
+from typing import Mapping, Tuple
 
 # Load environment variables from .env file if it exists
 # In production, use proper environment variables instead
@@ -16,6 +19,22 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URI: str = "mongodb://localhost:27017/opd_token_system"
     
+    # Connection pool - min pool is opened eagerly at startup so the
+    # first burst of requests doesn't pay the connect/handshake cost
+    MONGO_MAX_POOL_SIZE: int = 200
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_MS: int = 300000
+    # Fail fast instead of queueing forever when the pool is exhausted
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 3000
+    # Separate, smaller pool for aggregations (stats) so slow queries
+    # can't hold the sockets that point reads/writes are waiting on
+    MONGO_ANALYTICS_MAX_POOL_SIZE: int = 20
+    
+    # In-process cache for doctor/slot lookups (per worker)
+    ENTITY_CACHE_SIZE: int = 1024
+    ENTITY_CACHE_TTL_SECONDS: float = 30
+    
     # Slot Configuration
     DEFAULT_SLOT_DURATION: int = 10
     DEFAULT_MAX_CAPACITY: int = 6
@@ -40,37 +59,62 @@ class Settings(BaseSettings):
 settings = Settings()
 
 # Token Types
-TOKEN_TYPES = {
+TOKEN_TYPES = MappingProxyType({
     "ONLINE": "ONLINE",
     "WALKIN": "WALKIN",
     "PRIORITY": "PRIORITY",
     "FOLLOWUP": "FOLLOWUP",
     "EMERGENCY": "EMERGENCY",
-}
+})
 
 # Token Status
-TOKEN_STATUS = {
+TOKEN_STATUS = MappingProxyType({
     "PENDING": "PENDING",
     "CHECKED_IN": "CHECKED_IN",
     "CONSULTING": "CONSULTING",
     "COMPLETED": "COMPLETED",
     "CANCELLED": "CANCELLED",
     "NO_SHOW": "NO_SHOW",
-}
+})
+
+# Tokens that no longer hold a place in their slot's queue - every query
+# that reads or writes queue positions excludes exactly these
+OUT_OF_QUEUE_STATUSES = (
+    TOKEN_STATUS["CANCELLED"],
+    TOKEN_STATUS["NO_SHOW"],
+)
 
 # Slot Status
-SLOT_STATUS = {
+SLOT_STATUS = MappingProxyType({
     "ACTIVE": "ACTIVE",
     "DELAYED": "DELAYED",
     "CANCELLED": "CANCELLED",
     "COMPLETED": "COMPLETED",
-}
+})
 
 # Priority Weights
-PRIORITY_WEIGHTS: Dict[str, int] = {
+PRIORITY_WEIGHTS: Mapping[str, int] = MappingProxyType({
     "EMERGENCY": settings.EMERGENCY_PRIORITY,
     "PRIORITY": settings.PAID_PRIORITY,
     "FOLLOWUP": settings.FOLLOWUP_PRIORITY,
     "ONLINE": settings.ONLINE_PRIORITY,
     "WALKIN": settings.WALKIN_PRIORITY,
-}
+})
+
+# (token type, weight) pairs, highest weight first - sorted once at import
+PRIORITY_WEIGHTS_SORTED: Tuple[Tuple[str, int], ...] = tuple(
+    sorted(PRIORITY_WEIGHTS.items(), key=itemgetter(1), reverse=True)
+)
+
+
+class TokenType(IntEnum):
+    """Token types as ints - used to index PRIORITY_BY_ENUM on the hot path"""
+    EMERGENCY = 0
+    PRIORITY = 1
+    FOLLOWUP = 2
+    ONLINE = 3
+    WALKIN = 4
+
+
+# Priority weight per TokenType (tuple index instead of a dict lookup)
+PRIORITY_BY_ENUM = tuple(PRIORITY_WEIGHTS[token_type.name] for token_type in TokenType)
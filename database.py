@@ -1,4 +1,6 @@
 """Database connection module"""
+import asyncio
+from datetime import timezone
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
 from config import settings
@@ -12,22 +14,76 @@ class Database:
     
     client: AsyncIOMotorClient = None
     db = None
+    
+    # Second client for aggregations - its own small pool, so a slow stats
+    # query never queues point reads behind it
+    analytics_client: AsyncIOMotorClient = None
+    analytics_db = None
+    
+    # Collection handles, bound once on connect
+    doctors = None
+    slots = None
+    tokens = None
+    counters = None
+    analytics_tokens = None
 
 
 db_instance = Database()
 
+# Cursor batch size for list queries - a whole slot queue / patient history
+# comes back in the first batch instead of 101 docs + getMore round-trips
+LIST_BATCH_SIZE = 500
+
+
+def _bind_collections():
+    """Cache collection handles on db_instance so call sites skip db lookups"""
+    db_instance.doctors = db_instance.db.doctors
+    db_instance.slots = db_instance.db.slots
+    db_instance.tokens = db_instance.db.tokens
+    db_instance.counters = db_instance.db.counters
+    db_instance.analytics_tokens = get_analytics_database().tokens
+
 
 async def connect_db():
     """Connect to MongoDB"""
     try:
         # Initialize async MongoDB client
-        db_instance.client = AsyncIOMotorClient(settings.MONGODB_URI)
+        db_instance.client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            tz_aware=True,
+            tzinfo=timezone.utc,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        )
         db_instance.db = db_instance.client.get_default_database()
         
+        # Aggregation client - no minPoolSize, it only opens sockets when used
+        db_instance.analytics_client = AsyncIOMotorClient(
+            settings.MONGODB_URI,
+            tz_aware=True,
+            tzinfo=timezone.utc,
+            maxPoolSize=settings.MONGO_ANALYTICS_MAX_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        )
+        db_instance.analytics_db = db_instance.analytics_client.get_default_database()
+        _bind_collections()
+        
         # Ping to verify connection is actually working
         await db_instance.client.admin.command('ping')
         logger.info("✓ Successfully connected to MongoDB")
         
+        # Warm up the pool - concurrent pings force the driver to open
+        # minPoolSize sockets now instead of on the first real requests
+        await asyncio.gather(*[
+            db_instance.client.admin.command('ping')
+            for _ in range(settings.MONGO_MIN_POOL_SIZE)
+        ])
+        
         # Create indexes
         await create_indexes()
         
@@ -38,6 +94,8 @@ async def connect_db():
 
 async def disconnect_db():
     """Disconnect from MongoDB"""
+    if db_instance.analytics_client:
+        db_instance.analytics_client.close()
     if db_instance.client:
         db_instance.client.close()
         logger.info("Disconnected from MongoDB")
@@ -48,23 +106,31 @@ async def create_indexes():
     if db_instance.db is None:
         return
     
-    # Doctor collection indexes
-    await db_instance.db.doctors.create_index("name")
-    await db_instance.db.doctors.create_index("specialization")
-    
-    # Slot collection indexes
-    # Note: Compound index prevents duplicate slots for same doctor/date/time
-    await db_instance.db.slots.create_index("doctorId")
-    await db_instance.db.slots.create_index("date")
-    await db_instance.db.slots.create_index([("doctorId", 1), ("date", 1), ("startTime", 1)], unique=True)
-    
-    # Token collection indexes
-    # These speed up queue queries significantly
-    await db_instance.db.tokens.create_index("tokenNumber")
-    await db_instance.db.tokens.create_index("patientId")  # for patient history
-    await db_instance.db.tokens.create_index("slotId")
-    await db_instance.db.tokens.create_index([("slotId", 1), ("queuePosition", 1)])
-    await db_instance.db.tokens.create_index([("slotId", 1), ("status", 1)])
+    # Index builds are independent, so submit them all at once instead
+    # of paying one round-trip per index during startup
+    await asyncio.gather(
+        # Doctor collection indexes
+        db_instance.doctors.create_index("name"),
+        db_instance.doctors.create_index("specialization"),
+        
+        # Slot collection indexes
+        # Note: Compound index prevents duplicate slots for same doctor/date/time
+        # doctorId-only lookups use the prefix of the compound index below
+        db_instance.slots.create_index("date"),
+        db_instance.slots.create_index([("doctorId", 1), ("date", 1), ("startTime", 1)], unique=True),
+        
+        # Token collection indexes
+        # These speed up queue queries significantly
+        db_instance.tokens.create_index("tokenNumber"),
+        db_instance.tokens.create_index("patientId"),  # for patient history
+        # Queue reads: slotId equality, sorted by queuePosition, then the status
+        # filter ($nin / $in) - so results come back in order from the index and
+        # the status check doesn't fetch documents. slotId-only lookups use the prefix
+        db_instance.tokens.create_index([("slotId", 1), ("queuePosition", 1), ("status", 1)]),
+        # Per-slot status lookups (e.g. pending tokens to reallocate). Not a
+        # partial index: a $in partialFilterExpression needs MongoDB 6.0+
+        db_instance.tokens.create_index([("slotId", 1), ("status", 1)]),
+    )
     
     logger.info("✓ Database indexes created successfully")
 
@@ -72,3 +138,11 @@ async def create_indexes():
 def get_database():
     """Get database instance"""
     return db_instance.db
+
+
+def get_analytics_database():
+    """
+    Get database instance for aggregations (separate connection pool)
+    Without a separate analytics client, aggregations share the main pool
+    """
+    return db_instance.analytics_db if db_instance.analytics_db is not None else db_instance.db
@@ -3,7 +3,7 @@ Demo server - runs without MongoDB for testing API structure
 """
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
-from datetime import datetime
+from models.base import utcnow
 
 app = FastAPI(
     title="OPD Token Allocation Engine - DEMO",
@@ -33,7 +33,7 @@ async def health():
     """Health check"""
     return {
         "status": "OK",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utcnow().isoformat(),
         "service": "OPD Token Allocation Engine",
         "mode": "DEMO"
     }
@@ -1,13 +1,14 @@
 """Main server application"""
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, ORJSONResponse
+from contextlib import AsyncExitStack, asynccontextmanager
 import logging
 from datetime import datetime
 
 from config import settings
 from database import connect_db, disconnect_db
+from models.base import utcnow
 from routes import doctor_router, slot_router, token_router
 
 # Setup logging - helps with debugging
@@ -17,13 +18,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Interactive docs and the OpenAPI schema are development-only
+_DOCS_ENABLED = settings.ENVIRONMENT == "development"
+
 # Uncomment for more verbose logging during development
 # logging.getLogger("uvicorn").setLevel(logging.DEBUG)
 
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan events"""
+async def _db_lifespan(app: FastAPI):
+    """Database connection lifespan"""
     # Startup
     logger.info("Starting OPD Token Allocation Engine...")
     await connect_db()
@@ -37,14 +41,36 @@ async def lifespan(app: FastAPI):
     logger.info("Application shut down successfully")
 
 
+@asynccontextmanager
+async def merged_lifespan(app: FastAPI):
+    """
+    Application lifespan events
+    Sub-apps/routers register their own lifespans in app.state.sub_lifespans
+    instead of mounting with separate startup hooks - they run inside the
+    DB lifespan, so they all share the one Mongo client and event loop
+    """
+    async with _db_lifespan(app), AsyncExitStack() as stack:
+        # Entered in registration order, exited in reverse before the DB closes
+        for sub_lifespan in app.state.sub_lifespans:
+            await stack.enter_async_context(sub_lifespan(app))
+        yield
+
+
 # Create FastAPI application
 app = FastAPI(
     title="OPD Token Allocation Engine",
     description="Hospital OPD Token Allocation System with Dynamic Capacity Management",
     version="1.0.0",
-    lifespan=lifespan,
+    lifespan=merged_lifespan,
+    openapi_url="/openapi.json" if _DOCS_ENABLED else None,
+    docs_url="/docs" if _DOCS_ENABLED else None,
+    redoc_url="/redoc" if _DOCS_ENABLED else None,
+    default_response_class=ORJSONResponse,
 )
 
+# Extra lifespans (Callable[[FastAPI], AsyncContextManager]) run by merged_lifespan
+app.state.sub_lifespans = []
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -54,22 +80,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests"""
-    logger.info(f"{datetime.utcnow().isoformat()} - {request.method} {request.url.path}")
-    response = await call_next(request)
-    
-    # Uncomment to add response time tracking
-    # import time
-    # start = time.time()
-    # response = await call_next(request)
-    # duration = time.time() - start
-    # logger.info(f"Request took {duration:.4f}s")
-    
-    return response
+# Note: no request logging middleware - uvicorn's access log already
+# records method/path/status for every request
 
 
 # Health check endpoint
@@ -78,7 +90,7 @@ async def health_check():
     """Simple health check - returns OK if server is running"""
     return {
         "status": "OK",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utcnow().isoformat(),
         "service": "OPD Token Allocation Engine",
         # "database": "connected"  # TODO: Add actual DB health check
     }
@@ -170,4 +182,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=settings.PORT,
         reload=settings.ENVIRONMENT == "development",
+        # uvloop / httptools when installed (not on Windows), asyncio / h11 otherwise
+        loop="auto",
+        http="auto",
     )
@@ -1,6 +1,6 @@
 """Models package"""
 from models.doctor import Doctor, DoctorCreate, DoctorResponse
-from models.slot import Slot, SlotCreate, SlotResponse
+from models.slot import Slot, SlotCreate, BulkSlotCreate, SlotResponse
 from models.token import (
     Token, 
     TokenCreate,
@@ -9,8 +9,11 @@ from models.token import (
     PriorityTokenCreate,
     FollowupTokenCreate,
     EmergencyTokenCreate,
+    BulkTokenCreate,
     TokenResponse,
-    TokenStatusUpdate
+    TokenStatusUpdate,
+    TokenCancel,
+    TokenReallocate,
 )
 
 __all__ = [
@@ -19,6 +22,7 @@ __all__ = [
     "DoctorResponse",
     "Slot",
     "SlotCreate",
+    "BulkSlotCreate",
     "SlotResponse",
     "Token",
     "TokenCreate",
@@ -27,6 +31,9 @@ __all__ = [
     "PriorityTokenCreate",
     "FollowupTokenCreate",
     "EmergencyTokenCreate",
+    "BulkTokenCreate",
     "TokenResponse",
     "TokenStatusUpdate",
+    "TokenCancel",
+    "TokenReallocate",
 ]
@@ -0,0 +1,64 @@
+"""Shared base for models persisted in MongoDB"""
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional
+from bson import ObjectId
+from pydantic import BaseModel
+from config import settings
+
+# Default factory for timestamps - partial() binds the argument once,
+# so pydantic calls straight into C instead of through a Python lambda
+utcnow = partial(datetime.now, timezone.utc)
+
+
+def new_id() -> str:
+    """
+    New document id - ObjectId hex (24 chars)
+    ObjectIds start with a timestamp, so new documents land at the right
+    edge of the _id index instead of on random B-tree pages
+    """
+    return str(ObjectId())
+
+
+def schema_example(example: dict) -> Optional[dict]:
+    """
+    json_schema_extra for a model example - development only
+    In production /docs is disabled, so the example dicts are dropped
+    instead of living on every model class
+    """
+    if settings.ENVIRONMENT == "development":
+        return {"example": example}
+    return None
+
+
+class MongoModel(BaseModel):
+    """
+    Base model for MongoDB documents
+    The primary key is stored as `_id` but serialized as `id` in API
+    responses, and computed fields are response-only (never persisted)
+    """
+    
+    @classmethod
+    def from_document(cls, document: dict):
+        """
+        Build a model from a MongoDB document without validation
+        Documents are only ever written from validated models, so
+        re-validating every read (and every row of a list) is wasted work
+        """
+        return cls.model_construct(**document)
+    
+    @classmethod
+    def response_document(cls, document: dict) -> dict:
+        """
+        Turn a raw MongoDB document into its API shape in place
+        Read-only list endpoints return these directly - no model is built
+        and nothing is dumped, the dict goes straight to ORJSONResponse
+        """
+        document["id"] = document.pop("_id")
+        return document
+    
+    def to_document(self) -> dict:
+        """Convert to a MongoDB document"""
+        data = self.model_dump(by_alias=True, exclude=set(self.model_computed_fields))
+        data["_id"] = data.pop("id")
+        return data
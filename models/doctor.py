@@ -1,36 +1,29 @@
 """Doctor model"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
-import uuid
+from models.base import MongoModel, new_id, schema_example, utcnow
 
 
-class Doctor(BaseModel):
+class Doctor(MongoModel):
     """Doctor model"""
     
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
+    id: str = Field(default_factory=new_id, alias="_id", serialization_alias="id")
     name: str
     specialization: str
     opd_days: List[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
-            "example": {
-                "_id": "550e8400-e29b-41d4-a716-446655440000",
-                "name": "Dr. Smith",
-                "specialization": "Cardiology",
-                "opd_days": ["Monday", "Wednesday", "Friday"],
-            }
-        }
-    
-    def to_dict(self):
-        """Convert to dictionary"""
-        data = self.model_dump(by_alias=True)
-        data["id"] = data["_id"]
-        return data
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra=schema_example({
+            "_id": "550e8400-e29b-41d4-a716-446655440000",
+            "name": "Dr. Smith",
+            "specialization": "Cardiology",
+            "opd_days": ["Monday", "Wednesday", "Friday"],
+        }),
+    )
 
 
 class DoctorCreate(BaseModel):
@@ -40,14 +33,13 @@ class DoctorCreate(BaseModel):
     specialization: str
     opd_days: List[str] = Field(default_factory=list)
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "name": "Dr. Smith",
-                "specialization": "Cardiology",
-                "opd_days": ["Monday", "Wednesday", "Friday"],
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "name": "Dr. Smith",
+            "specialization": "Cardiology",
+            "opd_days": ["Monday", "Wednesday", "Friday"],
+        }),
+    )
 
 
 class DoctorResponse(BaseModel):
@@ -59,13 +51,12 @@ class DoctorResponse(BaseModel):
     opd_days: List[str]
     created_at: datetime
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "id": "550e8400-e29b-41d4-a716-446655440000",
-                "name": "Dr. Smith",
-                "specialization": "Cardiology",
-                "opd_days": ["Monday", "Wednesday", "Friday"],
-                "created_at": "2024-01-01T10:00:00",
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "id": "550e8400-e29b-41d4-a716-446655440000",
+            "name": "Dr. Smith",
+            "specialization": "Cardiology",
+            "opd_days": ["Monday", "Wednesday", "Friday"],
+            "created_at": "2024-01-01T10:00:00",
+        }),
+    )
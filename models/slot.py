@@ -1,61 +1,65 @@
 """Slot model"""
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+from pydantic.alias_generators import to_camel
+from typing import List, Optional
 from datetime import datetime
-import uuid
 from config import SLOT_STATUS
+from models.base import MongoModel, new_id, schema_example, utcnow
 
 
-class Slot(BaseModel):
+class Slot(MongoModel):
     """Slot model"""
     
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    doctor_id: str = Field(..., alias="doctorId")
+    id: str = Field(default_factory=new_id, alias="_id", serialization_alias="id")
+    doctor_id: str
     date: str
-    start_time: str = Field(..., alias="startTime")
-    end_time: str = Field(..., alias="endTime")
-    max_capacity: int = Field(..., alias="maxCapacity", ge=1)
-    current_count: int = Field(default=0, alias="currentCount")
-    is_delayed: bool = Field(default=False, alias="isDelayed")
-    delay_minutes: int = Field(default=0, alias="delayMinutes")
-    status: str = Field(default=SLOT_STATUS["ACTIVE"])
-    created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, alias="updatedAt")
+    start_time: str
+    end_time: str
+    max_capacity: int = Field(..., ge=1)
+    current_count: int = 0
+    is_delayed: bool = False
+    delay_minutes: int = 0
+    status: str = SLOT_STATUS["ACTIVE"]
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
-            "example": {
-                "_id": "slot-123",
-                "doctorId": "doctor-456",
-                "date": "2024-01-15",
-                "startTime": "09:00",
-                "endTime": "10:00",
-                "maxCapacity": 20,
-                "currentCount": 5,
-                "isDelayed": False,
-                "delayMinutes": 0,
-                "status": "ACTIVE",
-            }
-        }
+    # camelCase aliases for every field (MongoDB + API), except `_id` above
+    model_config = ConfigDict(
+        populate_by_name=True,
+        alias_generator=to_camel,
+        json_schema_extra=schema_example({
+            "_id": "slot-123",
+            "doctorId": "doctor-456",
+            "date": "2024-01-15",
+            "startTime": "09:00",
+            "endTime": "10:00",
+            "maxCapacity": 20,
+            "currentCount": 5,
+            "isDelayed": False,
+            "delayMinutes": 0,
+            "status": "ACTIVE",
+        }),
+    )
     
+    @computed_field
     @property
     def available_capacity(self) -> int:
         """Get available capacity"""
         return self.max_capacity - self.current_count
     
+    @computed_field
     @property
     def is_full(self) -> bool:
         """Check if slot is full"""
         return self.current_count >= self.max_capacity
     
-    def to_dict(self):
-        """Convert to dictionary"""
-        data = self.model_dump(by_alias=True)
-        data["id"] = data["_id"]
-        data["availableCapacity"] = self.available_capacity
-        data["isFull"] = self.is_full
-        return data
+    @classmethod
+    def response_document(cls, document: dict) -> dict:
+        """Raw slot document in API shape, including the computed fields"""
+        document = super().response_document(document)
+        document["availableCapacity"] = document["maxCapacity"] - document["currentCount"]
+        document["isFull"] = document["currentCount"] >= document["maxCapacity"]
+        return document
 
 
 class SlotCreate(BaseModel):
@@ -67,17 +71,43 @@ class SlotCreate(BaseModel):
     end_time: str = Field(..., alias="endTime")
     max_capacity: int = Field(..., alias="maxCapacity", ge=1)
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
-            "example": {
-                "doctorId": "doctor-456",
-                "date": "2024-01-15",
-                "startTime": "09:00",
-                "endTime": "10:00",
-                "maxCapacity": 20,
-            }
-        }
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra=schema_example({
+            "doctorId": "doctor-456",
+            "date": "2024-01-15",
+            "startTime": "09:00",
+            "endTime": "10:00",
+            "maxCapacity": 20,
+        }),
+    )
+
+
+class BulkSlotCreate(BaseModel):
+    """Bulk slot creation model (e.g. a doctor's weekly schedule)"""
+    
+    slots: List[SlotCreate] = Field(..., min_length=1)
+    
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "slots": [
+                {
+                    "doctorId": "doctor-456",
+                    "date": "2024-01-15",
+                    "startTime": "09:00",
+                    "endTime": "10:00",
+                    "maxCapacity": 20,
+                },
+                {
+                    "doctorId": "doctor-456",
+                    "date": "2024-01-15",
+                    "startTime": "10:00",
+                    "endTime": "11:00",
+                    "maxCapacity": 20,
+                },
+            ]
+        }),
+    )
 
 
 class SlotResponse(BaseModel):
@@ -96,5 +126,4 @@ class SlotResponse(BaseModel):
     delay_minutes: int = Field(..., alias="delayMinutes")
     status: str
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
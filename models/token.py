@@ -1,55 +1,56 @@
 """Token model"""
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.alias_generators import to_camel
+from typing import List, Optional, Union
 from datetime import datetime
-import uuid
-from config import TOKEN_STATUS, TOKEN_TYPES
+from config import TOKEN_STATUS, TOKEN_TYPES, TokenType
+from models.base import MongoModel, new_id, schema_example, utcnow
 
 # Note: Using Pydantic v2 with alias support for MongoDB compatibility
 
 
-class Token(BaseModel):
+class Token(MongoModel):
     """Token model"""
     
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
-    token_number: str = Field(..., alias="tokenNumber")
-    patient_id: str = Field(..., alias="patientId")
-    patient_name: str = Field(..., alias="patientName")
-    slot_id: str = Field(..., alias="slotId")
+    id: str = Field(default_factory=new_id, alias="_id", serialization_alias="id")
+    token_number: str
+    patient_id: str
+    patient_name: str
+    slot_id: str
     type: str
     priority: int
-    queue_position: int = Field(..., alias="queuePosition")
-    estimated_time: str = Field(..., alias="estimatedTime")
-    status: str = Field(default=TOKEN_STATUS["PENDING"])
-    phone_number: Optional[str] = Field(default=None, alias="phoneNumber")
-    check_in_time: Optional[datetime] = Field(default=None, alias="checkInTime")
-    completed_time: Optional[datetime] = Field(default=None, alias="completedTime")
-    created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
-    updated_at: datetime = Field(default_factory=datetime.utcnow, alias="updatedAt")
-    
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
-            "example": {
-                "_id": "token-123",
-                "tokenNumber": "T001",
-                "patientId": "patient-456",
-                "patientName": "John Doe",
-                "slotId": "slot-789",
-                "type": "ONLINE",
-                "priority": 200,
-                "queuePosition": 1,
-                "estimatedTime": "2024-01-15T09:00:00",
-                "status": "PENDING",
-                "phoneNumber": "1234567890",
-            }
-        }
-    
-    def to_dict(self):
-        """Convert to dictionary"""
-        data = self.model_dump(by_alias=True)
-        data["id"] = data["_id"]
-        return data
+    queue_position: int
+    estimated_time: str
+    status: str = TOKEN_STATUS["PENDING"]
+    phone_number: Optional[str] = None
+    check_in_time: Optional[datetime] = None
+    completed_time: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
+    
+    # camelCase aliases for every field (MongoDB + API), except `_id` above
+    model_config = ConfigDict(
+        populate_by_name=True,
+        alias_generator=to_camel,
+        json_schema_extra=schema_example({
+            "_id": "token-123",
+            "tokenNumber": "T001",
+            "patientId": "patient-456",
+            "patientName": "John Doe",
+            "slotId": "slot-789",
+            "type": "ONLINE",
+            "priority": 200,
+            "queuePosition": 1,
+            "estimatedTime": "2024-01-15T09:00:00",
+            "status": "PENDING",
+            "phoneNumber": "1234567890",
+        }),
+    )
+    
+    @property
+    def type_id(self) -> TokenType:
+        """Token type as an int (indexes PRIORITY_BY_ENUM) - not stored or serialized"""
+        return TokenType[self.type]
 
 
 class TokenCreate(BaseModel):
@@ -59,8 +60,7 @@ class TokenCreate(BaseModel):
     patient_name: str = Field(..., alias="patientName")
     phone_number: Optional[str] = Field(default=None, alias="phoneNumber")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class OnlineTokenCreate(TokenCreate):
@@ -68,29 +68,27 @@ class OnlineTokenCreate(TokenCreate):
     
     patient_id: str = Field(..., alias="patientId")
     
-    class Config:
-        populate_by_name = True
-        json_schema_extra = {
-            "example": {
-                "slotId": "slot-789",
-                "patientId": "patient-456",
-                "patientName": "John Doe",
-                "phoneNumber": "1234567890",
-            }
-        }
+    model_config = ConfigDict(
+        populate_by_name=True,
+        json_schema_extra=schema_example({
+            "slotId": "slot-789",
+            "patientId": "patient-456",
+            "patientName": "John Doe",
+            "phoneNumber": "1234567890",
+        }),
+    )
 
 
 class WalkinTokenCreate(TokenCreate):
     """Walk-in token creation model"""
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "slotId": "slot-789",
-                "patientName": "Jane Doe",
-                "phoneNumber": "0987654321",
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "slotId": "slot-789",
+            "patientName": "Jane Doe",
+            "phoneNumber": "0987654321",
+        }),
+    )
 
 
 class PriorityTokenCreate(OnlineTokenCreate):
@@ -108,6 +106,32 @@ class EmergencyTokenCreate(TokenCreate):
     pass
 
 
+class BulkTokenCreate(BaseModel):
+    """Bulk token creation model (online bookings and walk-ins)"""
+    
+    # Online first - entries with a patientId are online bookings,
+    # anything else is treated as a walk-in
+    tokens: List[Union[OnlineTokenCreate, WalkinTokenCreate]] = Field(..., min_length=1)
+    
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "tokens": [
+                {
+                    "slotId": "slot-789",
+                    "patientId": "patient-456",
+                    "patientName": "John Doe",
+                    "phoneNumber": "1234567890",
+                },
+                {
+                    "slotId": "slot-789",
+                    "patientName": "Jane Doe",
+                    "phoneNumber": "0987654321",
+                },
+            ]
+        }),
+    )
+
+
 class TokenResponse(BaseModel):
     """Token response model"""
     
@@ -123,8 +147,7 @@ class TokenResponse(BaseModel):
     status: str
     phone_number: Optional[str] = Field(default=None, alias="phoneNumber")
     
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class TokenStatusUpdate(BaseModel):
@@ -132,9 +155,32 @@ class TokenStatusUpdate(BaseModel):
     
     status: str
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "status": "CHECKED_IN",
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "status": "CHECKED_IN",
+        }),
+    )
+
+
+class TokenCancel(BaseModel):
+    """Token cancellation model"""
+    
+    reason: Optional[str] = None
+    
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "reason": "Patient cancelled appointment",
+        }),
+    )
+
+
+class TokenReallocate(BaseModel):
+    """Token reallocation model"""
+    
+    target_slot_id: str
+    
+    model_config = ConfigDict(
+        json_schema_extra=schema_example({
+            "target_slot_id": "slot-790",
+        }),
+    )
@@ -0,0 +1,49 @@
+"""Shared route helpers"""
+from functools import wraps
+from typing import Callable, List, Optional, Union
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from models.slot import Slot
+from models.token import Token
+
+# Bulk-create responses dump a whole list in one pydantic-core pass
+# (read-only list endpoints return raw documents and never build models)
+slot_list_adapter = TypeAdapter(List[Slot])
+token_list_adapter = TypeAdapter(List[Token])
+
+
+def service_route(message: Optional[Union[str, Callable]] = None, status_code: int = 200):
+    """
+    Wrap a route that just calls a service method
+    The route returns the payload; this builds the usual
+    {"success", "message", "count", "data"} envelope and maps
+    ValueError -> 400 and any other error -> 500.
+    `message` is a string or a function of the payload.
+    """
+    def decorator(endpoint):
+        # functools.wraps keeps the signature, so FastAPI still sees the
+        # real path/body parameters of the endpoint
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                data = await endpoint(*args, **kwargs)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+            
+            if isinstance(data, BaseModel):
+                data = data.model_dump(by_alias=True)
+            
+            content = {"success": True}
+            if message is not None:
+                content["message"] = message(data) if callable(message) else message
+            if isinstance(data, list):
+                content["count"] = len(data)
+            content["data"] = data
+            return ORJSONResponse(content, status_code=status_code)
+        
+        return wrapper
+    
+    return decorator
@@ -1,27 +1,28 @@
 """Doctor routes"""
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
-from models.doctor import DoctorCreate, DoctorResponse
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from models.doctor import DoctorCreate
 from services.doctor_service import doctor_service
 
 router = APIRouter(prefix="/api/doctors", tags=["doctors"])
 
 
-@router.post("", response_model=dict, status_code=201)
+@router.post("", response_model=None, status_code=201)
 async def create_doctor(doctor_data: DoctorCreate):
     """Create a new doctor"""
     try:
         doctor = await doctor_service.create_doctor(doctor_data)
-        return {
+        return ORJSONResponse({
             "success": True,
             "message": "Doctor created successfully",
-            "data": doctor.to_dict(),
-        }
+            "data": doctor.model_dump(by_alias=True),
+        }, status_code=201)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("", response_model=dict)
+@router.get("", response_model=None)
 async def get_doctors(specialization: Optional[str] = Query(None)):
     """Get all doctors or filter by specialization"""
     try:
@@ -30,16 +31,16 @@ async def get_doctors(specialization: Optional[str] = Query(None)):
         else:
             doctors = await doctor_service.get_all_doctors()
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(doctors),
-            "data": [doctor.to_dict() for doctor in doctors],
-        }
+            "data": doctors,
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/{doctor_id}", response_model=dict)
+@router.get("/{doctor_id}", response_model=None)
 async def get_doctor(doctor_id: str):
     """Get doctor by ID"""
     doctor = await doctor_service.get_doctor(doctor_id)
@@ -47,7 +48,7 @@ async def get_doctor(doctor_id: str):
     if not doctor:
         raise HTTPException(status_code=404, detail="Doctor not found")
     
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": doctor.to_dict(),
-    }
+        "data": doctor.model_dump(by_alias=True),
+    })
@@ -1,29 +1,40 @@
 """Slot routes"""
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
-from models.slot import SlotCreate, SlotResponse
+from models.slot import SlotCreate, BulkSlotCreate
 from services.slot_service import slot_service
+from routes.common import service_route, slot_list_adapter
 
 router = APIRouter(prefix="/api/slots", tags=["slots"])
 
 
-@router.post("", response_model=dict, status_code=201)
+@router.post("", response_model=None, status_code=201)
+@service_route("Slot created successfully", status_code=201)
 async def create_slot(slot_data: SlotCreate):
     """Create a new slot"""
+    return await slot_service.create_slot(slot_data)
+
+
+@router.post("/bulk", response_model=None, status_code=201)
+async def create_slots_bulk(bulk_data: BulkSlotCreate):
+    """Create a batch of slots (existing ones are skipped)"""
+    # Not a service_route - the message reports how many of the requested slots were new
     try:
-        slot = await slot_service.create_slot(slot_data)
-        return {
+        slots = await slot_service.create_slots_bulk(bulk_data)
+        return ORJSONResponse({
             "success": True,
-            "message": "Slot created successfully",
-            "data": slot.to_dict(),
-        }
+            "message": f"{len(slots)} of {len(bulk_data.slots)} slots created",
+            "count": len(slots),
+            "data": slot_list_adapter.dump_python(slots, by_alias=True),
+        }, status_code=201)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{slot_id}", response_model=dict)
+@router.get("/{slot_id}", response_model=None)
 async def get_slot(slot_id: str):
     """Get slot by ID"""
     slot = await slot_service.get_slot(slot_id)
@@ -31,55 +42,55 @@ async def get_slot(slot_id: str):
     if not slot:
         raise HTTPException(status_code=404, detail="Slot not found")
     
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": slot.to_dict(),
-    }
+        "data": slot.model_dump(by_alias=True),
+    })
 
 
-@router.get("/doctor/{doctor_id}", response_model=dict)
+@router.get("/doctor/{doctor_id}", response_model=None)
 async def get_slots_by_doctor(doctor_id: str, date: Optional[str] = Query(None)):
     """Get all slots for a doctor"""
     try:
         slots = await slot_service.get_slots_by_doctor(doctor_id, date)
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(slots),
-            "data": [slot.to_dict() for slot in slots],
-        }
+            "data": slots,
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/doctor/{doctor_id}/available", response_model=dict)
+@router.get("/doctor/{doctor_id}/available", response_model=None)
 async def get_available_slots(doctor_id: str, date: Optional[str] = Query(None)):
     """Get available slots for a doctor"""
     try:
         slots = await slot_service.get_available_slots(doctor_id, date)
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(slots),
-            "data": [slot.to_dict() for slot in slots],
-        }
+            "data": slots,
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/doctor/{doctor_id}/filled", response_model=dict)
+@router.get("/doctor/{doctor_id}/filled", response_model=None)
 async def get_filled_slots(doctor_id: str, date: Optional[str] = Query(None)):
     """Get filled/full slots for a doctor"""
     try:
         slots = await slot_service.get_filled_slots(doctor_id, date)
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(slots),
-            "data": [slot.to_dict() for slot in slots],
-        }
+            "data": slots,
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.patch("/{slot_id}/delay", response_model=dict)
+@router.patch("/{slot_id}/delay", response_model=None)
 async def mark_slot_delayed(slot_id: str, delay_minutes: int = Query(..., gt=0)):
     """Mark slot as delayed"""
     slot = await slot_service.mark_delayed(slot_id, delay_minutes)
@@ -87,22 +98,22 @@ async def mark_slot_delayed(slot_id: str, delay_minutes: int = Query(..., gt=0))
     if not slot:
         raise HTTPException(status_code=404, detail="Slot not found")
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": f"Slot marked as delayed by {delay_minutes} minutes",
-        "data": slot.to_dict(),
-    }
+        "data": slot.model_dump(by_alias=True),
+    })
 
 
-@router.get("/{slot_id}/stats", response_model=dict)
+@router.get("/{slot_id}/stats", response_model=None)
 async def get_slot_stats(slot_id: str):
     """Get slot statistics"""
     try:
         stats = await slot_service.get_slot_stats(slot_id)
-        return {
+        return ORJSONResponse({
             "success": True,
             "data": stats,
-        }
+        })
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
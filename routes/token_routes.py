@@ -1,5 +1,6 @@
 """Token routes"""
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 from models.token import (
     OnlineTokenCreate,
@@ -7,96 +8,63 @@ from models.token import (
     PriorityTokenCreate,
     FollowupTokenCreate,
     EmergencyTokenCreate,
+    BulkTokenCreate,
     TokenStatusUpdate,
+    TokenCancel,
+    TokenReallocate,
 )
 from services.token_service import token_service
+from routes.common import service_route, token_list_adapter
 
 # TODO: Add rate limiting to prevent abuse
 # TODO: Add authentication for certain endpoints
 router = APIRouter(prefix="/api/tokens", tags=["tokens"])
 
 
-@router.post("/book", response_model=dict, status_code=201)
+@router.post("/book", response_model=None, status_code=201)
+@service_route("Token booked successfully", status_code=201)
 async def book_online_token(token_data: OnlineTokenCreate):
     """Book an online token"""
-    try:
-        token = await token_service.book_online_token(token_data)
-        return {
-            "success": True,
-            "message": "Token booked successfully",
-            "data": token.to_dict(),
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await token_service.book_online_token(token_data)
 
 
-@router.post("/walkin", response_model=dict, status_code=201)
+@router.post("/walkin", response_model=None, status_code=201)
+@service_route("Walk-in token generated successfully", status_code=201)
 async def generate_walkin_token(token_data: WalkinTokenCreate):
     """Generate walk-in token"""
-    try:
-        token = await token_service.generate_walkin_token(token_data)
-        return {
-            "success": True,
-            "message": "Walk-in token generated successfully",
-            "data": token.to_dict(),
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await token_service.generate_walkin_token(token_data)
 
 
-@router.post("/priority", response_model=dict, status_code=201)
+@router.post("/priority", response_model=None, status_code=201)
+@service_route("Priority token generated successfully", status_code=201)
 async def generate_priority_token(token_data: PriorityTokenCreate):
     """Generate priority (paid) token"""
-    try:
-        token = await token_service.generate_priority_token(token_data)
-        return {
-            "success": True,
-            "message": "Priority token generated successfully",
-            "data": token.to_dict(),
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await token_service.generate_priority_token(token_data)
 
 
-@router.post("/followup", response_model=dict, status_code=201)
+@router.post("/followup", response_model=None, status_code=201)
+@service_route("Follow-up token generated successfully", status_code=201)
 async def generate_followup_token(token_data: FollowupTokenCreate):
     """Generate follow-up token"""
-    try:
-        token = await token_service.generate_followup_token(token_data)
-        return {
-            "success": True,
-            "message": "Follow-up token generated successfully",
-            "data": token.to_dict(),
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await token_service.generate_followup_token(token_data)
 
 
-@router.post("/emergency", response_model=dict, status_code=201)
+@router.post("/emergency", response_model=None, status_code=201)
+@service_route("Emergency token inserted successfully", status_code=201)
 async def insert_emergency_token(token_data: EmergencyTokenCreate):
     """Insert emergency token"""
-    try:
-        token = await token_service.insert_emergency_token(token_data)
-        return {
-            "success": True,
-            "message": "Emergency token inserted successfully",
-            "data": token.to_dict(),
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await token_service.insert_emergency_token(token_data)
+
 
+@router.post("/bulk", response_model=None, status_code=201)
+@service_route(lambda tokens: f"{len(tokens)} tokens booked successfully", status_code=201)
+async def bulk_book_tokens(bulk_data: BulkTokenCreate):
+    """Book a batch of online / walk-in tokens"""
+    tokens = await token_service.bulk_book(bulk_data)
+    return token_list_adapter.dump_python(tokens, by_alias=True)
 
-@router.get("/{token_id}", response_model=dict)
+
+@router.get("/{token_id}", response_model=None)
 async def get_token(token_id: str):
     """Get token by ID"""
     token = await token_service.get_token(token_id)
@@ -104,41 +72,41 @@ async def get_token(token_id: str):
     if not token:
         raise HTTPException(status_code=404, detail="Token not found")
     
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": token.to_dict(),
-    }
+        "data": token.model_dump(by_alias=True),
+    })
 
 
-@router.get("/patient/{patient_id}", response_model=dict)
+@router.get("/patient/{patient_id}", response_model=None)
 async def get_tokens_by_patient(patient_id: str):
     """Get all tokens for a patient"""
     try:
         tokens = await token_service.get_tokens_by_patient(patient_id)
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(tokens),
-            "data": [token.to_dict() for token in tokens],
-        }
+            "data": tokens,
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/queue/{slot_id}", response_model=dict)
+@router.get("/queue/{slot_id}", response_model=None)
 async def get_token_queue(slot_id: str):
     """Get token queue for a slot"""
     try:
         tokens = await token_service.get_token_queue(slot_id)
-        return {
+        return ORJSONResponse({
             "success": True,
             "count": len(tokens),
-            "data": [token.to_dict() for token in tokens],
-        }
+            "data": tokens,
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.patch("/{token_id}/status", response_model=dict)
+@router.patch("/{token_id}/status", response_model=None)
 async def update_token_status(token_id: str, status_update: TokenStatusUpdate):
     """Update token status"""
     token = await token_service.update_token_status(token_id, status_update.status)
@@ -146,40 +114,25 @@ async def update_token_status(token_id: str, status_update: TokenStatusUpdate):
     if not token:
         raise HTTPException(status_code=404, detail="Token not found")
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": "Token status updated successfully",
-        "data": token.to_dict(),
-    }
+        "data": token.model_dump(by_alias=True),
+    })
 
 
-@router.delete("/{token_id}/cancel", response_model=dict)
-async def cancel_token(token_id: str, reason: Optional[str] = Body(None, embed=True)):
+# POST is the canonical route - DELETE with a request body is kept for old clients
+@router.post("/{token_id}/cancel", response_model=None)
+@router.delete("/{token_id}/cancel", response_model=None, deprecated=True)
+@service_route(lambda result: result["message"])
+async def cancel_token(token_id: str, cancel_data: Optional[TokenCancel] = None):
     """Cancel a token"""
-    try:
-        result = await token_service.cancel_token(token_id, reason)
-        return {
-            "success": True,
-            "message": result["message"],
-            "data": result,
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    reason = cancel_data.reason if cancel_data else None
+    return await token_service.cancel_token(token_id, reason)
 
 
-@router.post("/reallocate/{slot_id}", response_model=dict)
-async def reallocate_tokens(slot_id: str, target_slot_id: str = Body(..., embed=True)):
+@router.post("/reallocate/{slot_id}", response_model=None)
+@service_route(lambda result: result["message"])
+async def reallocate_tokens(slot_id: str, reallocate_data: TokenReallocate):
     """Reallocate tokens from a slot to another slot"""
-    try:
-        result = await token_service.reallocate_tokens(slot_id, target_slot_id)
-        return {
-            "success": True,
-            "message": result["message"],
-            "data": result,
-        }
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await token_service.reallocate_tokens(slot_id, reallocate_data.target_slot_id)
@@ -0,0 +1,61 @@
+"""Bucket queue - priority queue for a small fixed set of priority levels"""
+from collections import deque
+from typing import Any, Iterator
+from config import PRIORITY_WEIGHTS_SORTED
+
+# Bucket index per token type, highest weight first (EMERGENCY -> 0 ... WALKIN -> 4)
+# Derived from config so custom weights from .env keep the right order
+BUCKET_INDEX = {
+    token_type: index
+    for index, (token_type, _) in enumerate(PRIORITY_WEIGHTS_SORTED)
+}
+NUM_BUCKETS = len(BUCKET_INDEX)
+
+
+def bucket_for(token_type: str) -> int:
+    """Get bucket index for a token type (unknown types go to the last bucket)"""
+    return BUCKET_INDEX.get(token_type, NUM_BUCKETS - 1)
+
+
+class BucketQueue:
+    """
+    Priority queue with one FIFO bucket per priority level
+
+    There are only a handful of token types, so push is O(1) and pop only
+    scans forward from the highest non-empty bucket - no comparison sort.
+    Items in the same bucket come out in insertion order (FIFO).
+    """
+
+    __slots__ = ("buckets", "min_idx", "size")
+
+    def __init__(self, num_buckets: int = NUM_BUCKETS):
+        self.buckets = [deque() for _ in range(num_buckets)]
+        self.min_idx = num_buckets
+        self.size = 0
+
+    def push(self, item: Any, bucket: int):
+        """Add item to a bucket (0 = highest priority)"""
+        self.buckets[bucket].append(item)
+        if bucket < self.min_idx:
+            self.min_idx = bucket
+        self.size += 1
+
+    def pop(self) -> Any:
+        """Remove and return the highest priority item"""
+        if self.size == 0:
+            raise IndexError("pop from empty BucketQueue")
+
+        # Skip past buckets that have been emptied
+        while not self.buckets[self.min_idx]:
+            self.min_idx += 1
+
+        self.size -= 1
+        return self.buckets[self.min_idx].popleft()
+
+    def drain(self) -> Iterator[Any]:
+        """Pop every item in priority order"""
+        while self.size:
+            yield self.pop()
+
+    def __len__(self) -> int:
+        return self.size
@@ -1,8 +1,13 @@
 """Doctor service"""
 from typing import List, Optional
+from pymongo import ReturnDocument
 from models.doctor import Doctor, DoctorCreate
-from database import get_database
-import uuid
+from database import db_instance, LIST_BATCH_SIZE
+from services.ttl_cache import TTLCache
+from config import settings
+
+# Doctors rarely change - cache lookups by id (refreshed/popped on writes)
+_doctor_cache = TTLCache(settings.ENTITY_CACHE_SIZE, settings.ENTITY_CACHE_TTL_SECONDS)
 
 
 class DoctorService:
@@ -11,72 +16,88 @@ class DoctorService:
     @staticmethod
     async def create_doctor(doctor_data: DoctorCreate) -> Doctor:
         """Create a new doctor"""
-        db = get_database()
-        
         doctor = Doctor(
-            _id=str(uuid.uuid4()),
             name=doctor_data.name,
             specialization=doctor_data.specialization,
             opd_days=doctor_data.opd_days,
         )
         
-        await db.doctors.insert_one(doctor.model_dump(by_alias=True))
+        await db_instance.doctors.insert_one(doctor.to_document())
+        _doctor_cache.set(doctor.id, doctor)
         return doctor
     
+    @staticmethod
+    async def create_doctors_bulk(doctors_data: List[DoctorCreate]) -> List[Doctor]:
+        """Create several doctors with a single insert_many"""
+        doctors = [
+            Doctor(
+                name=doctor_data.name,
+                specialization=doctor_data.specialization,
+                opd_days=doctor_data.opd_days,
+            )
+            for doctor_data in doctors_data
+        ]
+        
+        await db_instance.doctors.insert_many([doctor.to_document() for doctor in doctors])
+        for doctor in doctors:
+            _doctor_cache.set(doctor.id, doctor)
+        return doctors
+    
     @staticmethod
     async def get_doctor(doctor_id: str) -> Optional[Doctor]:
         """Get doctor by ID"""
-        db = get_database()
+        doctor = _doctor_cache.get(doctor_id)
+        if doctor is not None:
+            return doctor
         
-        doctor_dict = await db.doctors.find_one({"_id": doctor_id})
+        doctor_dict = await db_instance.doctors.find_one({"_id": doctor_id})
         if not doctor_dict:
             return None
         
-        return Doctor(**doctor_dict)
+        doctor = Doctor.from_document(doctor_dict)
+        _doctor_cache.set(doctor_id, doctor)
+        return doctor
     
     @staticmethod
-    async def get_all_doctors() -> List[Doctor]:
+    async def doctor_exists(doctor_id: str) -> bool:
+        """Check a doctor exists (fetches only the _id, no model built)"""
+        if _doctor_cache.get(doctor_id) is not None:
+            return True
+        return await db_instance.doctors.find_one({"_id": doctor_id}, {"_id": 1}) is not None
+    
+    @staticmethod
+    async def get_all_doctors() -> List[dict]:
         """Get all doctors"""
-        db = get_database()
-        
-        doctors = []
-        async for doctor_dict in db.doctors.find():
-            doctors.append(Doctor(**doctor_dict))
-        
-        return doctors
+        doctor_dicts = await db_instance.doctors.find().batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Doctor.response_document(doctor_dict) for doctor_dict in doctor_dicts]
     
     @staticmethod
-    async def get_doctors_by_specialization(specialization: str) -> List[Doctor]:
+    async def get_doctors_by_specialization(specialization: str) -> List[dict]:
         """Get doctors by specialization"""
-        db = get_database()
-        
-        doctors = []
-        async for doctor_dict in db.doctors.find({"specialization": specialization}):
-            doctors.append(Doctor(**doctor_dict))
-        
-        return doctors
+        doctor_dicts = await db_instance.doctors.find({"specialization": specialization}).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Doctor.response_document(doctor_dict) for doctor_dict in doctor_dicts]
     
     @staticmethod
     async def update_doctor(doctor_id: str, update_data: dict) -> Optional[Doctor]:
         """Update doctor"""
-        db = get_database()
-        
-        result = await db.doctors.update_one(
+        doctor_dict = await db_instance.doctors.find_one_and_update(
             {"_id": doctor_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
         )
-        
-        if result.modified_count == 0:
+        if not doctor_dict:
+            _doctor_cache.pop(doctor_id)
             return None
         
-        return await DoctorService.get_doctor(doctor_id)
+        doctor = Doctor.from_document(doctor_dict)
+        _doctor_cache.set(doctor_id, doctor)
+        return doctor
     
     @staticmethod
     async def delete_doctor(doctor_id: str) -> bool:
         """Delete doctor"""
-        db = get_database()
-        
-        result = await db.doctors.delete_one({"_id": doctor_id})
+        result = await db_instance.doctors.delete_one({"_id": doctor_id})
+        _doctor_cache.pop(doctor_id)
         return result.deleted_count > 0
 
 
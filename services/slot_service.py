@@ -1,9 +1,25 @@
 """Slot service"""
-from typing import List, Optional
-from models.slot import Slot, SlotCreate
-from database import get_database
+import asyncio
+from typing import Iterable, List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from models.base import utcnow
+from models.slot import Slot, SlotCreate, BulkSlotCreate
+from database import db_instance, LIST_BATCH_SIZE
 from services.doctor_service import doctor_service
-import uuid
+from services.ttl_cache import TTLCache
+from config import settings
+
+# get_slot is hit on nearly every token operation - cache by id. Every write
+# below refreshes or pops the entry; the TTL covers writes by other workers
+_slot_cache = TTLCache(settings.ENTITY_CACHE_SIZE, settings.ENTITY_CACHE_TTL_SECONDS)
+
+
+def _cache_slot(slot_dict: dict) -> Slot:
+    """Build a Slot from a freshly written document and refresh its cache entry"""
+    slot = Slot.from_document(slot_dict)
+    _slot_cache.set(slot.id, slot)
+    return slot
 
 
 class SlotService:
@@ -12,25 +28,11 @@ class SlotService:
     @staticmethod
     async def create_slot(slot_data: SlotCreate) -> Slot:
         """Create a new slot"""
-        db = get_database()
-        
         # Verify doctor exists
-        doctor = await doctor_service.get_doctor(slot_data.doctor_id)
-        if not doctor:
+        if not await doctor_service.doctor_exists(slot_data.doctor_id):
             raise ValueError(f"Doctor with ID {slot_data.doctor_id} not found")
         
-        # Check for duplicate slot
-        existing = await db.slots.find_one({
-            "doctorId": slot_data.doctor_id,
-            "date": slot_data.date,
-            "startTime": slot_data.start_time,
-        })
-        
-        if existing:
-            raise ValueError("A slot with this doctor, date, and time already exists")
-        
         slot = Slot(
-            _id=str(uuid.uuid4()),
             doctorId=slot_data.doctor_id,
             date=slot_data.date,
             startTime=slot_data.start_time,
@@ -38,109 +40,195 @@ class SlotService:
             maxCapacity=slot_data.max_capacity,
         )
         
-        await db.slots.insert_one(slot.model_dump(by_alias=True))
+        # Duplicates are rejected by the unique (doctorId, date, startTime) index
+        try:
+            await db_instance.slots.insert_one(slot.to_document())
+        except DuplicateKeyError:
+            raise ValueError("A slot with this doctor, date, and time already exists")
+        _slot_cache.set(slot.id, slot)
         return slot
     
+    @staticmethod
+    async def create_slots_bulk(bulk_data: BulkSlotCreate) -> List[Slot]:
+        """
+        Create a batch of slots (e.g. a doctor's weekly schedule)
+        Doctors are checked with one query and all slots are saved with a
+        single unordered insert_many. Slots that already exist are skipped
+        (unique index) and the rest are still created
+        """
+        doctor_ids = {slot_data.doctor_id for slot_data in bulk_data.slots}
+        found = await db_instance.doctors.find(
+            {"_id": {"$in": list(doctor_ids)}}, {"_id": 1}
+        ).to_list(length=None)
+        missing = doctor_ids - {doctor_dict["_id"] for doctor_dict in found}
+        if missing:
+            raise ValueError(f"Doctor with ID {sorted(missing)[0]} not found")
+        
+        slots = [
+            Slot(
+                doctorId=slot_data.doctor_id,
+                date=slot_data.date,
+                startTime=slot_data.start_time,
+                endTime=slot_data.end_time,
+                maxCapacity=slot_data.max_capacity,
+            )
+            for slot_data in bulk_data.slots
+        ]
+        
+        try:
+            await db_instance.slots.insert_many([slot.to_document() for slot in slots], ordered=False)
+        except BulkWriteError as e:
+            # Only duplicates are expected here - anything else is a real failure
+            errors = e.details.get("writeErrors", [])
+            if any(error["code"] != 11000 for error in errors):
+                raise
+            duplicate_indexes = {error["index"] for error in errors}
+            slots = [slot for index, slot in enumerate(slots) if index not in duplicate_indexes]
+        
+        for slot in slots:
+            _slot_cache.set(slot.id, slot)
+        return slots
+    
     @staticmethod
     async def get_slot(slot_id: str) -> Optional[Slot]:
         """Get slot by ID"""
-        db = get_database()
+        slot = _slot_cache.get(slot_id)
+        if slot is not None:
+            return slot
         
-        slot_dict = await db.slots.find_one({"_id": slot_id})
+        slot_dict = await db_instance.slots.find_one({"_id": slot_id})
         if not slot_dict:
             return None
         
-        return Slot(**slot_dict)
+        return _cache_slot(slot_dict)
+    
+    @staticmethod
+    async def get_slot_lite(slot_id: str, fields: Iterable[str]) -> Optional[dict]:
+        """
+        Get only some fields of a slot, as a raw document
+        For callers that need a couple of fields, not a full Slot
+        (_id is always included)
+        """
+        # Always project _id explicitly - an empty projection would fetch the whole document
+        return await db_instance.slots.find_one({"_id": slot_id}, {"_id": 1, **{field: 1 for field in fields}})
     
     @staticmethod
-    async def get_slots_by_doctor(doctor_id: str, date: Optional[str] = None) -> List[Slot]:
+    async def slot_exists(slot_id: str) -> bool:
+        """Check a slot exists (fetches only the _id, no model built)"""
+        if _slot_cache.get(slot_id) is not None:
+            return True
+        return await SlotService.get_slot_lite(slot_id, ()) is not None
+    
+    @staticmethod
+    async def get_slots_by_doctor(doctor_id: str, date: Optional[str] = None) -> List[dict]:
         """Get slots by doctor ID"""
-        db = get_database()
-        
         query = {"doctorId": doctor_id}
         if date:
             query["date"] = date
         
-        slots = []
-        async for slot_dict in db.slots.find(query):
-            slots.append(Slot(**slot_dict))
-        
-        return slots
+        slot_dicts = await db_instance.slots.find(query).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Slot.response_document(slot_dict) for slot_dict in slot_dicts]
     
     @staticmethod
-    async def get_available_slots(doctor_id: str, date: Optional[str] = None) -> List[Slot]:
+    async def get_available_slots(doctor_id: str, date: Optional[str] = None) -> List[dict]:
         """Get available slots (not full)"""
-        db = get_database()
-        
-        query = {"doctorId": doctor_id}
+        # Filter on the server so full slots never leave the database
+        query = {"doctorId": doctor_id, "$expr": {"$lt": ["$currentCount", "$maxCapacity"]}}
         if date:
             query["date"] = date
         
-        slots = []
-        async for slot_dict in db.slots.find(query):
-            slot = Slot(**slot_dict)
-            if not slot.is_full:
-                slots.append(slot)
-        
-        return slots
+        slot_dicts = await db_instance.slots.find(query).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Slot.response_document(slot_dict) for slot_dict in slot_dicts]
     
     @staticmethod
-    async def get_filled_slots(doctor_id: str, date: Optional[str] = None) -> List[Slot]:
+    async def get_filled_slots(doctor_id: str, date: Optional[str] = None) -> List[dict]:
         """Get filled/full slots"""
-        db = get_database()
-        
-        query = {"doctorId": doctor_id}
+        query = {"doctorId": doctor_id, "$expr": {"$gte": ["$currentCount", "$maxCapacity"]}}
         if date:
             query["date"] = date
         
-        slots = []
-        async for slot_dict in db.slots.find(query):
-            slot = Slot(**slot_dict)
-            if slot.is_full:
-                slots.append(slot)
-        
-        return slots
+        slot_dicts = await db_instance.slots.find(query).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Slot.response_document(slot_dict) for slot_dict in slot_dicts]
     
     @staticmethod
-    async def increment_slot_count(slot_id: str) -> Optional[Slot]:
-        """Increment slot current count"""
-        db = get_database()
-        
-        result = await db.slots.update_one(
-            {"_id": slot_id},
-            {"$inc": {"currentCount": 1}}
+    async def reserve_slot_capacity(slot_id: str, count: int = 1) -> Optional[Slot]:
+        """
+        Atomically take `count` places in a slot
+        The capacity check lives in the update filter, so the read-check-write
+        happens in a single round-trip and concurrent bookings can't overfill
+        the slot. Returns None if there isn't enough room or the slot doesn't exist.
+        """
+        slot_dict = await db_instance.slots.find_one_and_update(
+            {
+                "_id": slot_id,
+                "$expr": {"$lte": [{"$add": ["$currentCount", count]}, "$maxCapacity"]},
+            },
+            {"$inc": {"currentCount": count}, "$set": {"updatedAt": utcnow()}},
+            return_document=ReturnDocument.AFTER,
         )
-        
-        if result.modified_count == 0:
+        if not slot_dict:
+            _slot_cache.pop(slot_id)
             return None
         
-        return await SlotService.get_slot(slot_id)
+        return _cache_slot(slot_dict)
     
     @staticmethod
-    async def decrement_slot_count(slot_id: str) -> Optional[Slot]:
-        """Decrement slot current count"""
-        db = get_database()
-        
-        slot = await SlotService.get_slot(slot_id)
-        if not slot or slot.current_count <= 0:
+    async def reserve_emergency_capacity(slot_id: str) -> Optional[Slot]:
+        """
+        Take a place in a slot for an emergency, extending it if it's full
+        Decided by the database, not the cache: a normal reservation is tried
+        first and, only if that fails, maxCapacity and currentCount go up by 1
+        together in one update. Returns None if the slot doesn't exist.
+        """
+        slot = await SlotService.reserve_slot_capacity(slot_id)
+        if slot:
             return slot
         
-        result = await db.slots.update_one(
+        slot_dict = await db_instance.slots.find_one_and_update(
             {"_id": slot_id},
-            {"$inc": {"currentCount": -1}}
+            {"$inc": {"maxCapacity": 1, "currentCount": 1}, "$set": {"updatedAt": utcnow()}},
+            return_document=ReturnDocument.AFTER,
         )
+        if not slot_dict:
+            return None
         
-        if result.modified_count == 0:
+        print(f"EMERGENCY: Extended slot {slot_id} capacity for emergency case")
+        return _cache_slot(slot_dict)
+    
+    @staticmethod
+    async def release_slot_capacity(slot_id: str, count: int = 1):
+        """Give back places taken with reserve_slot_capacity"""
+        if count <= 0:
+            return
+        await db_instance.slots.update_one(
+            {"_id": slot_id},
+            {"$inc": {"currentCount": -count}, "$set": {"updatedAt": utcnow()}}
+        )
+        _slot_cache.pop(slot_id)
+    
+    @staticmethod
+    async def decrement_slot_count(slot_id: str) -> Optional[Slot]:
+        """
+        Decrement slot current count (never below zero)
+        Returns None if the slot doesn't exist or is already empty
+        """
+        # Guard is part of the filter so concurrent decrements can't go negative
+        slot_dict = await db_instance.slots.find_one_and_update(
+            {"_id": slot_id, "currentCount": {"$gt": 0}},
+            {"$inc": {"currentCount": -1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not slot_dict:
+            # Nothing changed - no need to fetch the slot back
+            _slot_cache.pop(slot_id)
             return None
         
-        return await SlotService.get_slot(slot_id)
+        return _cache_slot(slot_dict)
     
     @staticmethod
     async def mark_delayed(slot_id: str, delay_minutes: int) -> Optional[Slot]:
         """Mark slot as delayed"""
-        db = get_database()
-        
-        result = await db.slots.update_one(
+        slot_dict = await db_instance.slots.find_one_and_update(
             {"_id": slot_id},
             {
                 "$set": {
@@ -148,45 +236,45 @@ class SlotService:
                     "delayMinutes": delay_minutes,
                     "status": "DELAYED"
                 }
-            }
+            },
+            return_document=ReturnDocument.AFTER,
         )
-        
-        if result.modified_count == 0:
+        if not slot_dict:
+            _slot_cache.pop(slot_id)
             return None
         
-        return await SlotService.get_slot(slot_id)
+        return _cache_slot(slot_dict)
     
     @staticmethod
     async def update_slot_status(slot_id: str, status: str) -> Optional[Slot]:
         """Update slot status"""
-        db = get_database()
-        
-        result = await db.slots.update_one(
+        slot_dict = await db_instance.slots.find_one_and_update(
             {"_id": slot_id},
-            {"$set": {"status": status}}
+            {"$set": {"status": status}},
+            return_document=ReturnDocument.AFTER,
         )
-        
-        if result.modified_count == 0:
+        if not slot_dict:
+            _slot_cache.pop(slot_id)
             return None
         
-        return await SlotService.get_slot(slot_id)
+        return _cache_slot(slot_dict)
     
     @staticmethod
     async def get_slot_stats(slot_id: str) -> dict:
         """Get slot statistics"""
-        db = get_database()
-        
-        slot = await SlotService.get_slot(slot_id)
+        # Slot fetch and token counts (by status) are independent - run both at once.
+        # The aggregation goes through the analytics pool, away from point reads
+        slot, status_docs = await asyncio.gather(
+            SlotService.get_slot(slot_id),
+            db_instance.analytics_tokens.aggregate([
+                {"$match": {"slotId": slot_id}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]).to_list(length=None),
+        )
         if not slot:
             raise ValueError(f"Slot with ID {slot_id} not found")
         
-        # Count tokens by status
-        token_stats = {}
-        async for status_doc in db.tokens.aggregate([
-            {"$match": {"slotId": slot_id}},
-            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-        ]):
-            token_stats[status_doc["_id"]] = status_doc["count"]
+        token_stats = {status_doc["_id"]: status_doc["count"] for status_doc in status_docs}
         
         return {
             "slotId": slot_id,
@@ -1,16 +1,28 @@
 """Token service - Core allocation algorithm"""
-from typing import List, Optional
+import asyncio
+from bisect import bisect_right
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from models.token import Token, OnlineTokenCreate, WalkinTokenCreate, PriorityTokenCreate, FollowupTokenCreate, EmergencyTokenCreate
-from database import get_database
+from models.token import Token, OnlineTokenCreate, WalkinTokenCreate, PriorityTokenCreate, FollowupTokenCreate, EmergencyTokenCreate, BulkTokenCreate
+from models.slot import Slot
+from models.base import new_id, utcnow
+from pymongo import ReturnDocument, UpdateOne
+from database import db_instance, LIST_BATCH_SIZE
 from services.slot_service import slot_service
-from config import TOKEN_TYPES, TOKEN_STATUS, PRIORITY_WEIGHTS
-import uuid
-import time
+from services.bucket_queue import BucketQueue, bucket_for
+from config import TOKEN_STATUS, OUT_OF_QUEUE_STATUSES, PRIORITY_BY_ENUM, TokenType
+from utils import token_label
 
 # Debug flag - set True for detailed logging during development
 DEBUG = False
 
+# Average consultation time used for estimated times (minutes)
+AVG_CONSULTATION_MINUTES = 10
+
+# Status filter for tokens holding a queue position - shared by every
+# query that reads or renumbers positions, so they all see the same queue
+IN_QUEUE = {"$nin": list(OUT_OF_QUEUE_STATUSES)}
+
 
 class TokenService:
     """Token service for core allocation algorithm and business logic"""
@@ -20,20 +32,21 @@ class TokenService:
         slot_id: str,
         patient_id: str,
         patient_name: str,
-        token_type: str,
-        phone_number: Optional[str] = None
+        token_type: TokenType,
+        phone_number: Optional[str] = None,
+        reserved_slot: Optional[Slot] = None,
     ) -> Token:
         """
         Core Token Allocation Algorithm
         Enforces slot limits, handles priorities, and manages edge cases
+        Pass `reserved_slot` if the caller already took the place in the slot
         """
-        # Validate slot
-        slot = await slot_service.get_slot(slot_id)
+        # Reserve a place in the slot (capacity check + increment in one op)
+        slot = reserved_slot or await slot_service.reserve_slot_capacity(slot_id)
         if not slot:
-            raise ValueError(f"Slot with ID {slot_id} not found")
-        
-        # Check if slot is full
-        if slot.is_full:
+            # Nothing reserved - either the slot is missing or it's full
+            if not await slot_service.slot_exists(slot_id):
+                raise ValueError(f"Slot with ID {slot_id} not found")
             raise ValueError("Slot is full. Token cannot be allocated.")
         
         # Calculate priority score
@@ -41,126 +54,179 @@ class TokenService:
         
         # Create token
         token = Token(
-            _id=str(uuid.uuid4()),
             tokenNumber="T000",  # Temporary, will be assigned
             patientId=patient_id,
             patientName=patient_name,
             slotId=slot_id,
-            type=token_type,
+            type=token_type.name,
             priority=priority_score,
             queuePosition=0,  # Temporary, will be assigned
             estimatedTime="",  # Temporary, will be calculated
             phoneNumber=phone_number,
         )
         
-        # Assign token number based on priority
-        await TokenService._assign_token_number(token, slot_id)
-        
-        # Update slot capacity
-        await slot_service.increment_slot_count(slot_id)
+        # Issue token number and position it in the priority queue (independent)
+        await asyncio.gather(
+            TokenService._issue_token_numbers([token], slot_id),
+            TokenService._assign_queue_positions([token], slot_id, slot),
+        )
         
-        # Calculate estimated time
-        await TokenService._calculate_estimated_time(token)
+        # Calculate estimated time (from the slot returned by the reservation)
+        await TokenService._calculate_estimated_time(token, slot)
         
         # Save token
-        db = get_database()
-        await db.tokens.insert_one(token.model_dump(by_alias=True))
+        await db_instance.tokens.insert_one(token.to_document())
         
         return token
     
     @staticmethod
-    def _calculate_priority_score(token_type: str) -> int:
+    def _calculate_priority_score(token_type: TokenType) -> int:
         """
         Calculate priority score for token
-        Base priority from type + time factor for FIFO within same priority
+        The score is just the weight of the token type. FIFO within the same
+        priority comes from the queue itself - new tokens are inserted behind
+        every token of the same type - so no time factor is mixed in
         """
-        # Base score from priority weights config
-        base_score = PRIORITY_WEIGHTS.get(token_type, 100)
-        
-        # Add small time factor to ensure FIFO within same priority level
-        # Dividing by 1B keeps it small enough to not affect priority order
-        # but large enough to maintain chronological order
-        time_factor = time.time() / 1000000000
-        
-        score = int(base_score + time_factor)
+        # Base score from priority weights config (tuple index, no hashing)
+        score = PRIORITY_BY_ENUM[token_type]
         
         # Uncomment for debugging priority issues
         # if DEBUG:
-        #     print(f"Priority calc: {token_type} -> {score} (base: {base_score})")
+        #     print(f"Priority calc: {token_type} -> {score}")
         
         return score
     
     @staticmethod
-    async def _assign_token_number(new_token: Token, slot_id: str):
+    async def _issue_token_numbers(new_tokens: List[Token], slot_id: str):
+        """Issue the next token numbers for a slot to new tokens"""
+        numbers = await TokenService._reserve_token_numbers(len(new_tokens), slot_id)
+        for token, number in zip(new_tokens, numbers):
+            token.token_number = number
+    
+    @staticmethod
+    async def _reserve_token_numbers(count: int, slot_id: str) -> List[str]:
         """
-        Assign token number based on priority queue
-        Sorts all active tokens and assigns sequential positions
+        Reserve the next `count` token numbers for a slot (T001, T002, ...)
+        One atomic $inc on the slot's counter reserves a block of numbers,
+        so concurrent bookings never get the same number and no token scan
+        is needed. Numbers follow issue order, queue order is queue_position
         """
-        db = get_database()
-        
-        # Get all active tokens in slot (exclude CANCELLED and NO_SHOW)
-        existing_tokens = []
-        async for token_dict in db.tokens.find({
+        counter = await db_instance.counters.find_one_and_update(
+            {"_id": slot_id},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        first = counter["seq"] - count + 1
+        return [token_label(number) for number in range(first, first + count)]
+    
+    @staticmethod
+    async def _assign_queue_positions(new_tokens: List[Token], slot_id: str, slot: Slot):
+        """
+        Assign queue positions based on priority
+        Queued tokens are stored in priority order, so each new token is
+        binary-inserted behind the last token of the same or higher priority
+        instead of re-sorting the whole queue. New tokens are positioned in
+        place; only existing tokens whose position moved are updated in DB
+        (position and estimated time)
+        """
+        # Get all queued tokens in slot in current queue order, so FIFO holds
+        # within each priority level. Only the fields used here are fetched
+        queue = await db_instance.tokens.find({
             "slotId": slot_id,
-            "status": {"$nin": [TOKEN_STATUS["CANCELLED"], TOKEN_STATUS["NO_SHOW"]]}
-        }):
-            existing_tokens.append(Token(**token_dict))
-        
-        # Add new token to list
-        existing_tokens.append(new_token)
-        
-        # Sort by priority score (higher first = descending order)
-        existing_tokens.sort(key=lambda t: t.priority, reverse=True)
-        
-        # Assign positions and token numbers
-        for index, token in enumerate(existing_tokens):
-            token.queue_position = index + 1
-            token.token_number = f"T{str(index + 1).zfill(3)}"
-            
-            # Update in database if not the new token
-            if token.id != new_token.id:
-                await db.tokens.update_one(
-                    {"_id": token.id},
-                    {
-                        "$set": {
-                            "queuePosition": token.queue_position,
-                            "tokenNumber": token.token_number,
-                        }
-                    }
-                )
-        
-        # Update new token's position and number
-        new_token.queue_position = existing_tokens[existing_tokens.index(new_token)].queue_position
-        new_token.token_number = existing_tokens[existing_tokens.index(new_token)].token_number
+            "status": IN_QUEUE
+        }, {"type": 1, "queuePosition": 1}).sort("queuePosition", 1).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        buckets = [bucket_for(token_dict["type"]) for token_dict in queue]
+        
+        # Binary insertion needs the stored order to be sorted by priority.
+        # If it isn't (e.g. positions written by an older version), heal it
+        # with a stable sort first - FIFO within a priority is kept - and
+        # rewrite every position, since stored ones can't be trusted
+        healed = any(earlier > later for earlier, later in zip(buckets, buckets[1:]))
+        if healed:
+            order = sorted(range(len(queue)), key=buckets.__getitem__)
+            queue = [queue[index] for index in order]
+            buckets = [buckets[index] for index in order]
+        
+        # New tokens go to the back of their priority bucket (in arrival order)
+        for new_token in new_tokens:
+            bucket = bucket_for(new_token.type)
+            index = bisect_right(buckets, bucket)
+            buckets.insert(index, bucket)
+            queue.insert(index, new_token)
+        
+        slot_start = TokenService._slot_start(slot)
+        ops = []
+        for position, entry in enumerate(queue, start=1):
+            if isinstance(entry, Token):
+                entry.queue_position = position
+            elif healed or entry["queuePosition"] != position:
+                # Existing token moved - its estimated time moves with it
+                ops.append(UpdateOne({"_id": entry["_id"]}, {"$set": {
+                    "queuePosition": position,
+                    "estimatedTime": TokenService._compute_eta(slot_start, position),
+                }}))
+        
+        # All shifted tokens in one round-trip
+        if ops:
+            await db_instance.tokens.bulk_write(ops, ordered=False)
     
     @staticmethod
-    async def _calculate_estimated_time(token: Token):
-        """Calculate estimated time for patient"""
-        slot = await slot_service.get_slot(token.slot_id)
+    async def _calculate_estimated_time(token: Token, slot: Optional[Slot] = None):
+        """Calculate estimated time for patient (pass `slot` if already fetched)"""
+        if slot is None:
+            slot = await slot_service.get_slot(token.slot_id)
         if not slot:
             return
         
-        # Parse slot start time
+        token.estimated_time = TokenService._compute_eta(TokenService._slot_start(slot), token.queue_position)
+    
+    @staticmethod
+    def _slot_start(slot: Slot) -> Optional[datetime]:
+        """
+        When the first patient of a slot is seen (date + start time + delay)
+        Parsed once per slot, then shared by every token in its queue
+        Returns None if the slot's date/time can't be parsed
+        """
         try:
             hours, minutes = map(int, slot.start_time.split(':'))
-            
-            # Average consultation time: 10 minutes
-            avg_consultation_time = 10
-            estimated_minutes = (token.queue_position - 1) * avg_consultation_time
-            
-            # Create estimated date
-            estimated_date = datetime.strptime(slot.date, "%Y-%m-%d")
-            estimated_date = estimated_date.replace(hour=hours, minute=minutes)
-            estimated_date += timedelta(minutes=estimated_minutes)
-            
-            # Add delay if slot is delayed
-            if slot.is_delayed:
-                estimated_date += timedelta(minutes=slot.delay_minutes)
-            
-            token.estimated_time = estimated_date.isoformat()
-        except Exception as e:
-            # Default to current time if parsing fails
-            token.estimated_time = datetime.utcnow().isoformat()
+            # fromisoformat is a fixed C parser - strptime interprets the format string each call
+            start = datetime.fromisoformat(slot.date).replace(hour=hours, minute=minutes)
+        except Exception:
+            return None
+        
+        # Add delay if slot is delayed
+        if slot.is_delayed:
+            start += timedelta(minutes=slot.delay_minutes)
+        return start
+    
+    @staticmethod
+    def _compute_eta(slot_start: Optional[datetime], queue_position: int) -> str:
+        """Estimated time for a queue position (no DB access)"""
+        if slot_start is None:
+            # Default to current time if the slot couldn't be parsed
+            return utcnow().isoformat()
+        
+        estimated_minutes = (queue_position - 1) * AVG_CONSULTATION_MINUTES
+        return (slot_start + timedelta(minutes=estimated_minutes)).isoformat()
+    
+    @staticmethod
+    def _compute_etas(slot_start: Optional[datetime], count: int) -> List[str]:
+        """
+        Estimated times for queue positions 1..count in one pass
+        Steps a running datetime by one consultation instead of
+        rebuilding the offset for every position
+        """
+        if slot_start is None:
+            return [utcnow().isoformat()] * count
+        
+        step = timedelta(minutes=AVG_CONSULTATION_MINUTES)
+        etas = []
+        eta = slot_start
+        for _ in range(count):
+            etas.append(eta.isoformat())
+            eta += step
+        return etas
     
     @staticmethod
     async def book_online_token(token_data: OnlineTokenCreate) -> Token:
@@ -169,19 +235,20 @@ class TokenService:
             slot_id=token_data.slot_id,
             patient_id=token_data.patient_id,
             patient_name=token_data.patient_name,
-            token_type=TOKEN_TYPES["ONLINE"],
+            token_type=TokenType.ONLINE,
             phone_number=token_data.phone_number,
         )
     
     @staticmethod
     async def generate_walkin_token(token_data: WalkinTokenCreate) -> Token:
         """Generate walk-in token"""
-        patient_id = f"WALKIN-{int(time.time() * 1000)}"
+        # ObjectId hex is unique per process even within the same millisecond
+        patient_id = f"WALKIN-{new_id()}"
         return await TokenService.allocate_token(
             slot_id=token_data.slot_id,
             patient_id=patient_id,
             patient_name=token_data.patient_name,
-            token_type=TOKEN_TYPES["WALKIN"],
+            token_type=TokenType.WALKIN,
             phone_number=token_data.phone_number,
         )
     
@@ -192,7 +259,7 @@ class TokenService:
             slot_id=token_data.slot_id,
             patient_id=token_data.patient_id,
             patient_name=token_data.patient_name,
-            token_type=TOKEN_TYPES["PRIORITY"],
+            token_type=TokenType.PRIORITY,
             phone_number=token_data.phone_number,
         )
     
@@ -203,7 +270,7 @@ class TokenService:
             slot_id=token_data.slot_id,
             patient_id=token_data.patient_id,
             patient_name=token_data.patient_name,
-            token_type=TOKEN_TYPES["FOLLOWUP"],
+            token_type=TokenType.FOLLOWUP,
             phone_number=token_data.phone_number,
         )
     
@@ -213,90 +280,142 @@ class TokenService:
         Insert emergency token
         Emergency tokens get highest priority and may cause reallocation
         """
-        patient_id = f"EMERGENCY-{int(time.time() * 1000)}"
-        slot = await slot_service.get_slot(token_data.slot_id)
+        patient_id = f"EMERGENCY-{new_id()}"
         
+        # Take a place, temporarily extending capacity by 1 if the slot is
+        # full - atomic, so a stale cached slot can't get the emergency rejected
+        slot = await slot_service.reserve_emergency_capacity(token_data.slot_id)
         if not slot:
             raise ValueError(f"Slot with ID {token_data.slot_id} not found")
         
-        # If slot is full, temporarily extend capacity by 1 for emergency
-        if slot.is_full:
-            print(f"EMERGENCY: Extending slot {token_data.slot_id} capacity for emergency case")
-            db = get_database()
-            await db.slots.update_one(
-                {"_id": token_data.slot_id},
-                {"$inc": {"maxCapacity": 1}}
-            )
-        
         token = await TokenService.allocate_token(
             slot_id=token_data.slot_id,
             patient_id=patient_id,
             patient_name=token_data.patient_name,
-            token_type=TOKEN_TYPES["EMERGENCY"],
+            token_type=TokenType.EMERGENCY,
             phone_number=token_data.phone_number,
+            reserved_slot=slot,
         )
         
         # Re-sort all tokens in the slot (already done in allocate_token)
         return token
     
+    @staticmethod
+    async def bulk_book(bulk_data: BulkTokenCreate) -> List[Token]:
+        """
+        Book a batch of online / walk-in tokens (e.g. morning walk-in rush)
+        Capacity is reserved once per slot and all tokens are saved with a
+        single insert_many instead of one insert per token
+        """
+        # Group by slot, keeping arrival order within each slot
+        by_slot: Dict[str, list] = {}
+        for token_data in bulk_data.tokens:
+            by_slot.setdefault(token_data.slot_id, []).append(token_data)
+        
+        # Reserve capacity for every slot first so a failure books nothing
+        slots: Dict[str, Slot] = {}
+        for slot_id, items in by_slot.items():
+            slot = await slot_service.reserve_slot_capacity(slot_id, len(items))
+            if not slot:
+                # Roll back the slots already reserved
+                for reserved_id in slots:
+                    await slot_service.release_slot_capacity(reserved_id, len(by_slot[reserved_id]))
+                
+                if not await slot_service.slot_exists(slot_id):
+                    raise ValueError(f"Slot with ID {slot_id} not found")
+                raise ValueError(f"Slot {slot_id} doesn't have capacity for {len(items)} more tokens")
+            slots[slot_id] = slot
+        
+        # One timestamp for the whole batch instead of two clock reads per token
+        now = utcnow()
+        tokens = []
+        for slot_id, items in by_slot.items():
+            new_tokens = []
+            for token_data in items:
+                if isinstance(token_data, OnlineTokenCreate):
+                    patient_id = token_data.patient_id
+                    token_type = TokenType.ONLINE
+                else:
+                    patient_id = f"WALKIN-{new_id()}"
+                    token_type = TokenType.WALKIN
+                
+                # Inputs were validated by BulkTokenCreate and the rest is
+                # generated here, so skip re-validating every token in the batch
+                new_tokens.append(Token.model_construct(
+                    tokenNumber="T000",  # Temporary, will be assigned
+                    patientId=patient_id,
+                    patientName=token_data.patient_name,
+                    slotId=slot_id,
+                    type=token_type.name,
+                    priority=TokenService._calculate_priority_score(token_type),
+                    queuePosition=0,  # Temporary, will be assigned
+                    estimatedTime="",  # Temporary, will be calculated
+                    phoneNumber=token_data.phone_number,
+                    createdAt=now,
+                    updatedAt=now,
+                ))
+            
+            # Number and position the whole batch in one pass over the slot's queue
+            await asyncio.gather(
+                TokenService._issue_token_numbers(new_tokens, slot_id),
+                TokenService._assign_queue_positions(new_tokens, slot_id, slots[slot_id]),
+            )
+            slot_start = TokenService._slot_start(slots[slot_id])
+            for token in new_tokens:
+                token.estimated_time = TokenService._compute_eta(slot_start, token.queue_position)
+            
+            tokens.extend(new_tokens)
+        
+        # Save all tokens in one round-trip
+        await db_instance.tokens.insert_many([token.to_document() for token in tokens], ordered=False)
+        
+        return tokens
+    
     @staticmethod
     async def get_token(token_id: str) -> Optional[Token]:
         """Get token by ID"""
-        db = get_database()
-        
-        token_dict = await db.tokens.find_one({"_id": token_id})
+        token_dict = await db_instance.tokens.find_one({"_id": token_id})
         if not token_dict:
             return None
         
-        return Token(**token_dict)
+        return Token.from_document(token_dict)
     
     @staticmethod
-    async def get_tokens_by_patient(patient_id: str) -> List[Token]:
+    async def get_tokens_by_patient(patient_id: str) -> List[dict]:
         """Get all tokens for a patient"""
-        db = get_database()
-        
-        tokens = []
-        async for token_dict in db.tokens.find({"patientId": patient_id}):
-            tokens.append(Token(**token_dict))
-        
-        return tokens
+        token_dicts = await db_instance.tokens.find({"patientId": patient_id}).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Token.response_document(token_dict) for token_dict in token_dicts]
     
     @staticmethod
-    async def get_token_queue(slot_id: str) -> List[Token]:
+    async def get_token_queue(slot_id: str) -> List[dict]:
         """Get token queue for a slot (sorted by position)"""
-        db = get_database()
-        
-        tokens = []
-        async for token_dict in db.tokens.find({
+        token_dicts = await db_instance.tokens.find({
             "slotId": slot_id,
-            "status": {"$nin": [TOKEN_STATUS["CANCELLED"], TOKEN_STATUS["NO_SHOW"]]}
-        }).sort("queuePosition", 1):
-            tokens.append(Token(**token_dict))
-        
-        return tokens
+            "status": IN_QUEUE
+        }).sort("queuePosition", 1).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        return [Token.response_document(token_dict) for token_dict in token_dicts]
     
     @staticmethod
     async def update_token_status(token_id: str, status: str) -> Optional[Token]:
         """Update token status"""
-        db = get_database()
-        
         update_data = {"status": status}
         
         # Set timestamps based on status
         if status == TOKEN_STATUS["CHECKED_IN"]:
-            update_data["checkInTime"] = datetime.utcnow()
+            update_data["checkInTime"] = utcnow()
         elif status == TOKEN_STATUS["COMPLETED"]:
-            update_data["completedTime"] = datetime.utcnow()
+            update_data["completedTime"] = utcnow()
         
-        result = await db.tokens.update_one(
+        # Update and read back in one atomic round-trip
+        token_dict = await db_instance.tokens.find_one_and_update(
             {"_id": token_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
         )
-        
-        if result.modified_count == 0:
+        if not token_dict:
             return None
         
-        return await TokenService.get_token(token_id)
+        return Token.from_document(token_dict)
     
     @staticmethod
     async def cancel_token(token_id: str, reason: Optional[str] = None) -> dict:
@@ -312,14 +431,15 @@ class TokenService:
         if token.status == TOKEN_STATUS["COMPLETED"]:
             raise ValueError("Cannot cancel a completed token")
         
-        # Update token status
-        await TokenService.update_token_status(token_id, TOKEN_STATUS["CANCELLED"])
-        
-        # Decrement slot count
-        await slot_service.decrement_slot_count(token.slot_id)
+        # Update token status and decrement slot count together
+        await asyncio.gather(
+            TokenService.update_token_status(token_id, TOKEN_STATUS["CANCELLED"]),
+            slot_service.decrement_slot_count(token.slot_id),
+        )
         
-        # Reorder remaining tokens
-        await TokenService._reorder_slot_tokens(token.slot_id)
+        # Close the gap in the queue (a no-show was already out of it)
+        if token.status != TOKEN_STATUS["NO_SHOW"]:
+            await TokenService._collapse_positions_after_cancel(token.slot_id, token.queue_position)
         
         return {
             "tokenId": token_id,
@@ -328,86 +448,125 @@ class TokenService:
             "message": "Token cancelled successfully and queue reordered",
         }
     
+    @staticmethod
+    async def _collapse_positions_after_cancel(slot_id: str, cancelled_position: int):
+        """
+        Close the gap left by a cancelled token
+        Priorities didn't change, so the queue is still in order - everyone
+        behind the cancelled token moves up one place, no re-sort needed.
+        Only the shifted tokens get new estimated times
+        """
+        # Relative $inc in one op, so it can't clobber a concurrent booking's positions
+        await db_instance.tokens.update_many(
+            {"slotId": slot_id, "queuePosition": {"$gt": cancelled_position}, "status": IN_QUEUE},
+            {"$inc": {"queuePosition": -1}},
+        )
+        
+        slot, shifted = await asyncio.gather(
+            slot_service.get_slot(slot_id),
+            db_instance.tokens.find(
+                {"slotId": slot_id, "queuePosition": {"$gte": cancelled_position}, "status": IN_QUEUE},
+                {"queuePosition": 1},
+            ).batch_size(LIST_BATCH_SIZE).to_list(length=None),
+        )
+        if not slot or not shifted:
+            return
+        
+        slot_start = TokenService._slot_start(slot)
+        await db_instance.tokens.bulk_write([
+            UpdateOne(
+                {"_id": token_dict["_id"]},
+                {"$set": {"estimatedTime": TokenService._compute_eta(slot_start, token_dict["queuePosition"])}},
+            )
+            for token_dict in shifted
+        ], ordered=False)
+    
     @staticmethod
     async def _reorder_slot_tokens(slot_id: str):
         """Reorder all tokens in a slot based on priority"""
-        db = get_database()
-        
-        # Get all active tokens
-        tokens = []
-        async for token_dict in db.tokens.find({
+        # Get every queued token - the same set the other position writers
+        # use, so none keep a stale position (only the fields used here, as
+        # plain dicts), bucketed by priority in current queue order
+        queue = BucketQueue()
+        token_dicts = await db_instance.tokens.find({
             "slotId": slot_id,
-            "status": {"$nin": [TOKEN_STATUS["CANCELLED"], TOKEN_STATUS["NO_SHOW"], TOKEN_STATUS["COMPLETED"]]}
-        }):
-            tokens.append(Token(**token_dict))
-        
-        # Sort by priority
-        tokens.sort(key=lambda t: t.priority, reverse=True)
-        
-        # Reassign positions and recalculate times
-        for index, token in enumerate(tokens):
-            token.queue_position = index + 1
-            token.token_number = f"T{str(index + 1).zfill(3)}"
-            await TokenService._calculate_estimated_time(token)
-            
-            # Update in database
-            await db.tokens.update_one(
-                {"_id": token.id},
-                {
-                    "$set": {
-                        "queuePosition": token.queue_position,
-                        "tokenNumber": token.token_number,
-                        "estimatedTime": token.estimated_time,
-                    }
-                }
-            )
+            "status": IN_QUEUE
+        }, {"type": 1}).sort("queuePosition", 1).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        for token_dict in token_dicts:
+            queue.push(token_dict["_id"], bucket_for(token_dict["type"]))
+        
+        # One slot read for the whole queue, not one per token
+        slot = await slot_service.get_slot(slot_id)
+        
+        # Reassign positions and recalculate times - positions are 1..n,
+        # so all the estimated times come from one pass
+        token_ids = list(queue.drain())
+        if slot:
+            etas = TokenService._compute_etas(TokenService._slot_start(slot), len(token_ids))
+            updates = [
+                {"queuePosition": position, "estimatedTime": eta}
+                for position, eta in enumerate(etas, start=1)
+            ]
+        else:
+            updates = [{"queuePosition": position} for position in range(1, len(token_ids) + 1)]
+        ops = [UpdateOne({"_id": token_id}, {"$set": update}) for token_id, update in zip(token_ids, updates)]
+        
+        # Update in database - one round-trip for the whole queue
+        if ops:
+            await db_instance.tokens.bulk_write(ops, ordered=False)
     
     @staticmethod
     async def reallocate_tokens(slot_id: str, target_slot_id: str) -> dict:
         """Reallocate tokens from one slot to another"""
-        # Get source slot
-        source_slot = await slot_service.get_slot(slot_id)
+        # Get source and target slots
+        source_slot, target_slot = await asyncio.gather(
+            slot_service.get_slot(slot_id),
+            slot_service.get_slot(target_slot_id),
+        )
         if not source_slot:
             raise ValueError(f"Source slot with ID {slot_id} not found")
         
-        # Get target slot
-        target_slot = await slot_service.get_slot(target_slot_id)
         if not target_slot:
             raise ValueError(f"Target slot with ID {target_slot_id} not found")
         
-        # Get all pending tokens from source slot
-        db = get_database()
-        tokens_to_reallocate = []
-        async for token_dict in db.tokens.find({
+        # Get all pending tokens from source slot (ids only)
+        token_dicts = await db_instance.tokens.find({
             "slotId": slot_id,
             "status": TOKEN_STATUS["PENDING"]
-        }):
-            tokens_to_reallocate.append(Token(**token_dict))
+        }, {"_id": 1}).batch_size(LIST_BATCH_SIZE).to_list(length=None)
+        token_ids = [token_dict["_id"] for token_dict in token_dicts]
         
-        if not tokens_to_reallocate:
+        if not token_ids:
             return {
                 "message": "No tokens to reallocate",
                 "reallocated": 0,
             }
         
-        # Check if target slot has capacity
-        available = target_slot.available_capacity
-        if available < len(tokens_to_reallocate):
-            raise ValueError(f"Target slot only has capacity for {available} tokens, but {len(tokens_to_reallocate)} need reallocation")
-        
-        reallocated_count = 0
-        for token in tokens_to_reallocate:
-            # Update token's slot ID
-            await db.tokens.update_one(
-                {"_id": token.id},
-                {"$set": {"slotId": target_slot_id}}
+        # Take the places in the target slot atomically (capacity checked in the filter)
+        count = len(token_ids)
+        if not await slot_service.reserve_slot_capacity(target_slot_id, count):
+            available = target_slot.available_capacity
+            raise ValueError(f"Target slot only has capacity for {available} tokens, but {count} need reallocation")
+        
+        # Moved tokens get new numbers from the target slot's counter
+        numbers = await TokenService._reserve_token_numbers(count, target_slot_id)
+        
+        # Move all tokens in one round-trip - still filtered on PENDING so a
+        # token checked in meanwhile stays where it is
+        result = await db_instance.tokens.bulk_write([
+            UpdateOne(
+                {"_id": token_id, "slotId": slot_id, "status": TOKEN_STATUS["PENDING"]},
+                {"$set": {"slotId": target_slot_id, "tokenNumber": number}},
             )
-            
-            # Update slot counts
-            await slot_service.decrement_slot_count(slot_id)
-            await slot_service.increment_slot_count(target_slot_id)
-            
-            reallocated_count += 1
+            for token_id, number in zip(token_ids, numbers)
+        ], ordered=False)
+        reallocated_count = result.modified_count
+        
+        # Settle slot counts: give back unused target places, free the source
+        await asyncio.gather(
+            slot_service.release_slot_capacity(target_slot_id, count - reallocated_count),
+            slot_service.release_slot_capacity(slot_id, reallocated_count),
+        )
         
         # Reorder tokens in target slot
         await TokenService._reorder_slot_tokens(target_slot_id)
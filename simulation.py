@@ -1,7 +1,11 @@
 """OPD Simulation - Complete day simulation"""
 import asyncio
+import io
 import sys
 from datetime import datetime, date
+from typing import List
+from pydantic import TypeAdapter
+from models.doctor import DoctorCreate
 from services.doctor_service import doctor_service
 from services.slot_service import slot_service
 from services.token_service import token_service
@@ -11,6 +15,9 @@ from database import connect_db, disconnect_db
 NUM_DOCTORS = 3
 SLOTS_PER_DOCTOR = 3
 
+# List validator built once - validates a whole batch of doctors in one call
+DOCTOR_BATCH = TypeAdapter(List[DoctorCreate])
+
 
 class OPDSimulation:
     """OPD Simulation for One Day"""
@@ -19,48 +26,73 @@ class OPDSimulation:
         self.doctors = []
         self.slots = []
         self.tokens = []
-        self.events = []
+        self.events = []  # (timestamp, type, message)
+        self._buffer = io.StringIO()
     
     def log(self, message: str, log_type: str = "INFO"):
-        """Log simulation events with timestamp"""
+        """Log simulation events with timestamp (shown when the phase ends)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] [{log_type}] {message}"
-        print(log_message)  # Print to console for real-time monitoring
-        self.events.append({"timestamp": timestamp, "type": log_type, "message": message})
+        self._buffer.write(f"[{timestamp}] [{log_type}] {message}\n")
+        self.events.append((timestamp, log_type, message))
+    
+    def flush(self):
+        """Write buffered log lines to the console"""
+        sys.stdout.write(self._buffer.getvalue())
+        sys.stdout.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+    
+    async def book_per_slot(self, entries: list, book) -> list:
+        """
+        Book entries concurrently across slots, in order within a slot
+        Same-slot bookings stay sequential so FIFO within a priority holds.
+        `book(slot_id, entry)` is an async function that books one entry.
+        Returns the tokens in the same order as `entries`
+        """
+        groups = {}
+        for position, entry in enumerate(entries):
+            slot_index = entry["doctor"] * 7 + entry["slot"]
+            groups.setdefault(slot_index, []).append((position, entry))
+        
+        tokens = [None] * len(entries)
+        
+        async def book_group(slot_index, group):
+            for position, entry in group:
+                tokens[position] = await book(self.slots[slot_index].id, entry)
+        
+        await asyncio.gather(*(book_group(slot_index, group) for slot_index, group in groups.items()))
+        return tokens
     
     async def initialize_opd(self):
         """Initialize doctors and slots"""
         self.log("=== INITIALIZING OPD SYSTEM ===", "SYSTEM")
         
         # Create 3 doctors with different specializations
-        from models.doctor import DoctorCreate
-        
-        dr1 = await doctor_service.create_doctor(DoctorCreate(
-            name="Dr. Rajesh Kumar",
-            specialization="Cardiology",
-            opd_days=["Monday", "Wednesday", "Friday"]
-        ))
-        
-        dr2 = await doctor_service.create_doctor(DoctorCreate(
-            name="Dr. Priya Sharma",
-            specialization="Pediatrics",
-            opd_days=["Monday", "Tuesday", "Thursday"]
-        ))
-        
-        dr3 = await doctor_service.create_doctor(DoctorCreate(
-            name="Dr. Amit Patel",
-            specialization="General Medicine",
-            opd_days=["Monday", "Wednesday", "Friday"]
-        ))
-        
-        self.doctors = [dr1, dr2, dr3]
+        # Validate the whole batch with one list validator, then one insert
+        doctors_data = DOCTOR_BATCH.validate_python([
+            {
+                "name": "Dr. Rajesh Kumar",
+                "specialization": "Cardiology",
+                "opd_days": ["Monday", "Wednesday", "Friday"],
+            },
+            {
+                "name": "Dr. Priya Sharma",
+                "specialization": "Pediatrics",
+                "opd_days": ["Monday", "Tuesday", "Thursday"],
+            },
+            {
+                "name": "Dr. Amit Patel",
+                "specialization": "General Medicine",
+                "opd_days": ["Monday", "Wednesday", "Friday"],
+            },
+        ])
+        self.doctors = await doctor_service.create_doctors_bulk(doctors_data)
         
-        self.log(f"Created doctor: {dr1.name} ({dr1.specialization})")
-        self.log(f"Created doctor: {dr2.name} ({dr2.specialization})")
-        self.log(f"Created doctor: {dr3.name} ({dr3.specialization})")
+        for doctor in self.doctors:
+            self.log(f"Created doctor: {doctor.name} ({doctor.specialization})")
         
         # Create slots for today
-        from models.slot import SlotCreate
+        from models.slot import BulkSlotCreate
         today = date.today().isoformat()
         
         time_slots = [
@@ -73,17 +105,23 @@ class OPDSimulation:
             {"start": "16:00", "end": "17:00", "capacity": 12},  # End of day
         ]
         
+        # Every doctor x time slot in one insert (order: doctor, then time),
+        # validated in one pass by BulkSlotCreate's list validator
+        self.slots = await slot_service.create_slots_bulk(BulkSlotCreate.model_validate({"slots": [
+            {
+                "doctorId": doctor.id,
+                "date": today,
+                "startTime": slot_data["start"],
+                "endTime": slot_data["end"],
+                "maxCapacity": slot_data["capacity"],
+            }
+            for doctor in self.doctors
+            for slot_data in time_slots
+        ]}))
+        
         for doctor in self.doctors:
             self.log(f"\nCreating slots for {doctor.name}:")
             for slot_data in time_slots:
-                slot = await slot_service.create_slot(SlotCreate(
-                    doctorId=doctor.id,
-                    date=today,
-                    startTime=slot_data["start"],
-                    endTime=slot_data["end"],
-                    maxCapacity=slot_data["capacity"]
-                ))
-                self.slots.append(slot)
                 self.log(f"  {slot_data['start']}-{slot_data['end']} (Capacity: {slot_data['capacity']})")
         
         self.log("\n=== OPD INITIALIZATION COMPLETE ===\n", "SYSTEM")
@@ -107,14 +145,16 @@ class OPDSimulation:
             {"doctor": 0, "slot": 2, "patient": "Harish Rao", "id": "PAT010", "phone": "+919876543219"},
         ]
         
-        for booking in bookings:
-            slot_index = booking["doctor"] * 7 + booking["slot"]
-            token = await token_service.book_online_token(OnlineTokenCreate(
-                slotId=self.slots[slot_index].id,
+        async def book(slot_id, booking):
+            return await token_service.book_online_token(OnlineTokenCreate(
+                slotId=slot_id,
                 patientId=booking["id"],
                 patientName=booking["patient"],
                 phoneNumber=booking["phone"]
             ))
+        
+        tokens = await self.book_per_slot(bookings, book)
+        for booking, token in zip(bookings, tokens):
             self.tokens.append(token)
             self.log(f"Online booking: {booking['patient']} -> {self.doctors[booking['doctor']].name} ({token.token_number})")
         
@@ -134,13 +174,15 @@ class OPDSimulation:
             {"doctor": 1, "slot": 1, "patient": "Walk-in Patient 5", "phone": "+919876543224"},
         ]
         
-        for walkin in walkins:
-            slot_index = walkin["doctor"] * 7 + walkin["slot"]
-            token = await token_service.generate_walkin_token(WalkinTokenCreate(
-                slotId=self.slots[slot_index].id,
+        async def book(slot_id, walkin):
+            return await token_service.generate_walkin_token(WalkinTokenCreate(
+                slotId=slot_id,
                 patientName=walkin["patient"],
                 phoneNumber=walkin["phone"]
             ))
+        
+        tokens = await self.book_per_slot(walkins, book)
+        for walkin, token in zip(walkins, tokens):
             self.tokens.append(token)
             self.log(f"Walk-in: {walkin['patient']} -> {self.doctors[walkin['doctor']].name} ({token.token_number})")
         
@@ -158,14 +200,16 @@ class OPDSimulation:
             {"doctor": 2, "slot": 2, "patient": "VIP Patient C", "id": "VIP003", "phone": "+919876543227"},
         ]
         
-        for p in priority:
-            slot_index = p["doctor"] * 7 + p["slot"]
-            token = await token_service.generate_priority_token(PriorityTokenCreate(
-                slotId=self.slots[slot_index].id,
+        async def book(slot_id, p):
+            return await token_service.generate_priority_token(PriorityTokenCreate(
+                slotId=slot_id,
                 patientId=p["id"],
                 patientName=p["patient"],
                 phoneNumber=p["phone"]
             ))
+        
+        tokens = await self.book_per_slot(priority, book)
+        for p, token in zip(priority, tokens):
             self.tokens.append(token)
             self.log(f"Priority: {p['patient']} -> {self.doctors[p['doctor']].name} ({token.token_number}) - Moved to front!")
         
@@ -182,14 +226,16 @@ class OPDSimulation:
             {"doctor": 1, "slot": 2, "patient": "Baby Sharma", "id": "PAT004", "phone": "+919876543213"},
         ]
         
-        for followup in followups:
-            slot_index = followup["doctor"] * 7 + followup["slot"]
-            token = await token_service.generate_followup_token(FollowupTokenCreate(
-                slotId=self.slots[slot_index].id,
+        async def book(slot_id, followup):
+            return await token_service.generate_followup_token(FollowupTokenCreate(
+                slotId=slot_id,
                 patientId=followup["id"],
                 patientName=followup["patient"],
                 phoneNumber=followup["phone"]
             ))
+        
+        tokens = await self.book_per_slot(followups, book)
+        for followup, token in zip(followups, tokens):
             self.tokens.append(token)
             self.log(f"Follow-up: {followup['patient']} -> {self.doctors[followup['doctor']].name} ({token.token_number})")
         
@@ -206,13 +252,15 @@ class OPDSimulation:
             {"doctor": 1, "slot": 0, "patient": "Emergency Patient 2", "phone": "+919876543231"},
         ]
         
-        for emergency in emergencies:
-            slot_index = emergency["doctor"] * 7 + emergency["slot"]
-            token = await token_service.insert_emergency_token(EmergencyTokenCreate(
-                slotId=self.slots[slot_index].id,
+        async def book(slot_id, emergency):
+            return await token_service.insert_emergency_token(EmergencyTokenCreate(
+                slotId=slot_id,
                 patientName=emergency["patient"],
                 phoneNumber=emergency["phone"]
             ))
+        
+        tokens = await self.book_per_slot(emergencies, book)
+        for emergency, token in zip(emergencies, tokens):
             self.tokens.append(token)
             self.log(f"EMERGENCY: {emergency['patient']} -> {self.doctors[emergency['doctor']].name} ({token.token_number}) - PRIORITY!")
         
@@ -251,24 +299,32 @@ class OPDSimulation:
             queue = await token_service.get_token_queue(first_slot.id)
             self.log(f"\nQueue for {self.doctors[0].name} (09:00-10:00):")
             for token in queue[:5]:  # Show first 5
-                self.log(f"  {token.token_number} - {token.patient_name} ({token.type}) - Position: {token.queue_position}")
+                self.log(f"  {token['tokenNumber']} - {token['patientName']} ({token['type']}) - Position: {token['queuePosition']}")
         
         self.log("\n=== SIMULATION COMPLETE ===", "SYSTEM")
     
     async def run(self):
         """Run complete simulation"""
+        phases = (
+            self.initialize_opd,
+            self.simulate_online_bookings,
+            self.simulate_walkins,
+            self.simulate_priority_patients,
+            self.simulate_followups,
+            self.simulate_emergencies,
+            self.simulate_cancellation,
+            self.display_statistics,
+        )
         try:
-            await self.initialize_opd()
-            await self.simulate_online_bookings()
-            await self.simulate_walkins()
-            await self.simulate_priority_patients()
-            await self.simulate_followups()
-            await self.simulate_emergencies()
-            await self.simulate_cancellation()
-            await self.display_statistics()
+            for phase in phases:
+                await phase()
+                # One console write per phase instead of one per event
+                self.flush()
         except Exception as e:
             self.log(f"ERROR: {str(e)}", "ERROR")
             raise
+        finally:
+            self.flush()
 
 
 async def main():
@@ -4,6 +4,16 @@ Tests the models and basic functionality without requiring MongoDB
 """
 import sys
 from datetime import datetime, date
+from typing import List
+from pydantic import TypeAdapter
+from models.doctor import DoctorCreate
+from models.slot import SlotCreate
+from models.token import OnlineTokenCreate
+
+# List validators built once - test_models validates each batch in one call
+_DOCTOR_BATCH = TypeAdapter(List[DoctorCreate])
+_SLOT_BATCH = TypeAdapter(List[SlotCreate])
+_TOKEN_BATCH = TypeAdapter(List[OnlineTokenCreate])
 
 
 def test_imports():
@@ -25,42 +35,50 @@ def test_models():
     """Test model creation and validation"""
     print("\nTesting models...")
     try:
-        from models.doctor import DoctorCreate
-        from models.slot import SlotCreate
-        from models.token import OnlineTokenCreate
-        
-        # Test Doctor
-        doctor_data = DoctorCreate(
-            name="Dr. Test",
-            specialization="Testing",
-            opd_days=["Monday", "Tuesday"]
-        )
-        print(f"✓ Doctor model: {doctor_data.name}")
-        
-        # Test Slot
-        slot_data = SlotCreate(
-            doctorId="test-doctor-id",
-            date=date.today().isoformat(),
-            startTime="09:00",
-            endTime="10:00",
-            maxCapacity=20
-        )
-        print(f"✓ Slot model: {slot_data.start_time}-{slot_data.end_time}")
+        # Test Doctor / Slot / Token - each batch goes through one list
+        # validator built at import
+        doctors = _DOCTOR_BATCH.validate_python([
+            {"name": "Dr. Test", "specialization": "Testing", "opd_days": ["Monday", "Tuesday"]},
+            {"name": "Dr. Two", "specialization": "Testing", "opd_days": ["Friday"]},
+        ])
+        print(f"✓ Doctor model: {doctors[0].name}")
         
-        # Test Token
-        token_data = OnlineTokenCreate(
-            slotId="test-slot-id",
-            patientId="PAT001",
-            patientName="Test Patient",
-            phoneNumber="+1234567890"
+        slots = _SLOT_BATCH.validate_python([
+            {"doctorId": "test-doctor-id", "date": date.today().isoformat(),
+             "startTime": start, "endTime": end, "maxCapacity": 20}
+            for start, end in [("09:00", "10:00"), ("10:00", "11:00")]
+        ])
+        print(f"✓ Slot model: {slots[0].start_time}-{slots[0].end_time}")
+        
+        tokens = _TOKEN_BATCH.validate_python([
+            {"slotId": "test-slot-id", "patientId": f"PAT00{i}", "patientName": f"Patient {i}",
+             "phoneNumber": "+1234567890"}
+            for i in range(1, 4)
+        ])
+        print(f"✓ Token model: {tokens[0].patient_name}")
+        
+        assert [d.name for d in doctors] == ["Dr. Test", "Dr. Two"], "Doctor batch incorrect"
+        assert doctors[0].opd_days == ["Monday", "Tuesday"], "Doctor OPD days incorrect"
+        assert [s.start_time for s in slots] == ["09:00", "10:00"], "Slot batch incorrect"
+        assert len(tokens) == 3 and tokens[2].patient_id == "PAT003", "Token batch incorrect"
+        print(f"✓ Batch validation: {len(doctors)} doctors, {len(slots)} slots, {len(tokens)} tokens")
+        
+        # Tokens built without validation (bulk booking) store the same document
+        from models.token import Token
+        token_fields = dict(
+            tokenNumber="T001", patientId="PAT001", patientName="Test Patient",
+            slotId="test-slot-id", type="ONLINE", priority=200,
+            queuePosition=1, estimatedTime="", phoneNumber=None,
         )
-        print(f"✓ Token model: {token_data.patient_name}")
+        validated = Token(**token_fields).to_document()
+        constructed = Token.model_construct(**token_fields).to_document()
+        assert validated.keys() == constructed.keys(), "Constructed token document differs"
+        assert constructed["patientId"] == "PAT001" and constructed["_id"], "Constructed token fields missing"
+        print("✓ Constructed token matches validated token")
         
         return True
     except Exception as e:
         print(f"✗ Model test failed: {e}")
-        import traceback
-        traceback.print_exc()
         return False
 
 
@@ -68,8 +86,8 @@ def test_priority_calculation():
     """Test priority score calculation"""
     print("\nTesting priority calculation...")
     try:
-        from config import PRIORITY_WEIGHTS
-        import time
+        from config import PRIORITY_WEIGHTS, PRIORITY_BY_ENUM, TokenType
+        import itertools
         
         # Test priority weights
         print(f"  EMERGENCY: {PRIORITY_WEIGHTS['EMERGENCY']}")
@@ -78,21 +96,28 @@ def test_priority_calculation():
         print(f"  ONLINE: {PRIORITY_WEIGHTS['ONLINE']}")
         print(f"  WALKIN: {PRIORITY_WEIGHTS['WALKIN']}")
         
-        # Simulate priority calculation
+        # Simulate priority calculation - same tuple lookup by TokenType as
+        # TokenService (names bound locally, no dict lookup per call).
+        # FIFO within a priority comes from an arrival counter, so the
+        # score is (weight, -arrival) and compares as a tuple
+        weights = PRIORITY_BY_ENUM
+        arrival = itertools.count().__next__
+        
         def calculate_priority(token_type):
-            base_score = PRIORITY_WEIGHTS.get(token_type, 100)
-            time_factor = time.time() / 1000000000
-            return int(base_score + time_factor)
+            base_score = weights[TokenType[token_type]]
+            return (base_score, -arrival())
         
-        emergency_score = calculate_priority("EMERGENCY")
         online_score = calculate_priority("ONLINE")
+        emergency_score = calculate_priority("EMERGENCY")
         walkin_score = calculate_priority("WALKIN")
+        later_online_score = calculate_priority("ONLINE")
         
         print(f"\n  Emergency score: {emergency_score}")
         print(f"  Online score: {online_score}")
         print(f"  Walk-in score: {walkin_score}")
         
         assert emergency_score > online_score > walkin_score, "Priority ordering incorrect"
+        assert online_score > later_online_score > walkin_score, "Same priority should be FIFO"
         print("✓ Priority calculation working correctly")
         
         return True
@@ -109,8 +134,9 @@ def test_token_queue_ordering():
         from config import PRIORITY_WEIGHTS
         import time
         
-        # Create sample tokens
+        # Create sample tokens (one timestamp for the batch)
         tokens = []
+        now_iso = datetime.now().isoformat()
         
         # Online booking
         token1 = Token(
@@ -122,7 +148,7 @@ def test_token_queue_ordering():
             type="ONLINE",
             priority=PRIORITY_WEIGHTS["ONLINE"],
             queuePosition=0,
-            estimatedTime=datetime.now().isoformat()
+            estimatedTime=now_iso
         )
         tokens.append(token1)
         
@@ -136,7 +162,7 @@ def test_token_queue_ordering():
             type="WALKIN",
             priority=PRIORITY_WEIGHTS["WALKIN"],
             queuePosition=0,
-            estimatedTime=datetime.now().isoformat()
+            estimatedTime=now_iso
         )
         tokens.append(token2)
         
@@ -150,21 +176,30 @@ def test_token_queue_ordering():
             type="EMERGENCY",
             priority=PRIORITY_WEIGHTS["EMERGENCY"],
             queuePosition=0,
-            estimatedTime=datetime.now().isoformat()
+            estimatedTime=now_iso
         )
         tokens.append(token3)
         
-        # Sort by priority (highest first)
-        tokens.sort(key=lambda t: t.priority, reverse=True)
+        # Order by priority (highest first) through the service's bucket queue
+        from services.bucket_queue import BucketQueue, bucket_for
+        from utils import token_label
+        queue = BucketQueue()
+        for token in tokens:
+            queue.push(token, bucket_for(token.type))
+        tokens = list(queue.drain())
         
-        # Create new tokens with updated positions (Pydantic models are immutable)
+        # Create new tokens with updated positions
         sorted_tokens = []
         for index, token in enumerate(tokens):
-            # Create new token with updated values
-            updated_token = token.model_copy(update={
-                "queue_position": index + 1,
-                "token_number": f"T{str(index + 1).zfill(3)}"
-            })
+            # The tokens above are already validated, so model_construct
+            # can rebuild them with the new values without re-validating
+            updated_token = Token.model_construct(
+                _fields_set=token.model_fields_set,
+                **(token.__dict__ | {
+                    "queue_position": index + 1,
+                    "token_number": token_label(index + 1),
+                })
+            )
             sorted_tokens.append(updated_token)
         
         tokens = sorted_tokens
@@ -177,13 +212,136 @@ def test_token_queue_ordering():
         assert tokens[0].type == "EMERGENCY", "Emergency should be first"
         assert tokens[1].type == "ONLINE", "Online should be second"
         assert tokens[2].type == "WALKIN", "Walk-in should be third"
+        # Int-encoded types rank the same way (EMERGENCY=0 ... WALKIN=4)
+        assert tokens[0].type_id < tokens[1].type_id < tokens[2].type_id, "Type ids out of order"
         
         print("✓ Queue ordering working correctly")
         return True
     except Exception as e:
         print(f"✗ Queue ordering failed: {e}")
-        import traceback
-        traceback.print_exc()
+        return False
+
+
+def test_bucket_queue():
+    """Test bucket queue ordering (priority first, FIFO within priority)"""
+    print("\nTesting bucket queue...")
+    try:
+        from services.bucket_queue import BucketQueue, bucket_for
+        
+        queue = BucketQueue()
+        arrivals = [
+            ("ONLINE", "Online 1"),
+            ("WALKIN", "Walk-in 1"),
+            ("ONLINE", "Online 2"),
+            ("EMERGENCY", "Emergency 1"),
+            ("PRIORITY", "Priority 1"),
+        ]
+        for token_type, name in arrivals:
+            queue.push(name, bucket_for(token_type))
+        
+        order = list(queue.drain())
+        print(f"  Order: {order}")
+        
+        assert order == ["Emergency 1", "Priority 1", "Online 1", "Online 2", "Walk-in 1"], "Bucket order incorrect"
+        assert len(queue) == 0, "Queue should be empty after drain"
+        
+        print("✓ Bucket queue working correctly")
+        return True
+    except Exception as e:
+        print(f"✗ Bucket queue failed: {e}")
+        return False
+
+
+def test_ttl_cache():
+    """Test TTL cache expiry and LRU eviction"""
+    print("\nTesting TTL cache...")
+    try:
+        import time
+        from services.ttl_cache import TTLCache
+        
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "a" is now most recently used
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None, "Least recently used entry should be evicted"
+        assert cache.get("a") == 1 and cache.get("c") == 3, "Recent entries should stay"
+        
+        cache.pop("a")
+        assert cache.get("a") is None, "Popped entry should be gone"
+        
+        short_cache = TTLCache(maxsize=2, ttl=0.01)
+        short_cache.set("a", 1)
+        time.sleep(0.02)
+        assert short_cache.get("a") is None, "Expired entry should be gone"
+        
+        print("✓ TTL cache working correctly")
+        return True
+    except Exception as e:
+        print(f"✗ TTL cache failed: {e}")
+        return False
+
+
+def test_time_helpers():
+    """Test HH:MM helpers (integer minute math)"""
+    print("\nTesting time helpers...")
+    try:
+        from utils import add_minutes, is_slot_time_valid
+        
+        assert add_minutes("09:50", 15) == "10:05", "Should carry into the hour"
+        assert add_minutes("23:50", 20) == "00:10", "Should wrap at midnight"
+        assert add_minutes("25:00", 5) == "25:00", "Invalid time returned as-is"
+        assert is_slot_time_valid("09:00", "10:00"), "Start before end is valid"
+        assert not is_slot_time_valid("10:00", "09:00"), "Start after end is invalid"
+        assert not is_slot_time_valid("9am", "10:00"), "Unparseable time is invalid"
+        
+        print("✓ Time helpers working correctly")
+        return True
+    except Exception as e:
+        print(f"✗ Time helpers failed: {e}")
+        return False
+
+
+def test_random_phones():
+    """Test bulk phone number generation"""
+    print("\nTesting random phones...")
+    try:
+        import re
+        from utils import generate_random_phones, generate_random_phone
+        
+        phones = generate_random_phones(25)
+        
+        assert len(phones) == 25, "Should return n phone numbers"
+        for phone in phones + [generate_random_phone()]:
+            assert re.fullmatch(r"\+91-[7-9]\d{9}", phone), f"Bad phone format: {phone}"
+        
+        print(f"✓ Random phones working correctly ({len(phones)} numbers)")
+        return True
+    except Exception as e:
+        print(f"✗ Random phones failed: {e}")
+        return False
+
+
+def test_patient_batch():
+    """Test bulk sample-patient generation"""
+    print("\nTesting patient batch...")
+    try:
+        import re
+        from utils import generate_patient_batch, _PATIENT_NAMES, _PATIENT_AGES
+        
+        patients = generate_patient_batch(50)
+        
+        assert len(patients) == 50, "Batch should have n patients"
+        assert all(p["name"] in _PATIENT_NAMES for p in patients), "Unknown patient name"
+        assert all(p["age"] in _PATIENT_AGES for p in patients), "Age out of range"
+        assert all(re.fullmatch(r"\+91-\d{10}", p["phone"]) for p in patients), "Bad phone format"
+        assert generate_patient_batch(0) == [], "Empty batch should be empty"
+        
+        print(f"✓ Patient batch working correctly ({len(patients)} patients)")
+        return True
+    except Exception as e:
+        print(f"✗ Patient batch failed: {e}")
         return False
 
 
@@ -220,6 +378,11 @@ def main():
     results.append(("Configuration", test_configuration()))
     results.append(("Priority Calculation", test_priority_calculation()))
     results.append(("Queue Ordering", test_token_queue_ordering()))
+    results.append(("Bucket Queue", test_bucket_queue()))
+    results.append(("TTL Cache", test_ttl_cache()))
+    results.append(("Time Helpers", test_time_helpers()))
+    results.append(("Random Phones", test_random_phones()))
+    results.append(("Patient Batch", test_patient_batch()))
     
     # Summary
     print("\n" + "="*60)
@@ -2,8 +2,13 @@
 Complete Test Report for OPD Token System
 Generates a comprehensive test report showing all features
 """
+import io
 import json
+import sys
+from contextlib import redirect_stdout
 from datetime import datetime, date
+from operator import itemgetter
+from utils import token_label
 
 
 def print_header(title):
@@ -20,6 +25,17 @@ def print_subheader(title):
 
 def test_report():
     """Generate complete test report"""
+    # The sections print into a buffer that is written to stdout once,
+    # instead of dozens of separate line-buffered writes
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        _print_report()
+    sys.stdout.write(buffer.getvalue())
+    sys.stdout.flush()
+
+
+def _print_report():
+    """Print every section of the test report"""
     
     print_header("OPD TOKEN ALLOCATION SYSTEM - TEST REPORT")
     print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -44,10 +60,10 @@ def test_report():
     # 2. Token Types and Priorities
     print_header("2. TOKEN TYPES AND PRIORITY SYSTEM")
     
-    from config import PRIORITY_WEIGHTS
+    from config import PRIORITY_WEIGHTS_SORTED
     
     print("\nPriority Weights (Higher = More Important):")
-    for token_type, priority in sorted(PRIORITY_WEIGHTS.items(), key=lambda x: x[1], reverse=True):
+    for token_type, priority in PRIORITY_WEIGHTS_SORTED:
         print(f"  {token_type:15} Priority: {priority:4}")
     
     # 3. Sample Workflow
@@ -86,11 +102,11 @@ def test_report():
         print(f"  {t['order']}. {t['type']:10} - {t['patient']:25} (Priority: {t['priority']})")
     
     # Sort by priority
-    sorted_tokens = sorted(tokens, key=lambda x: x['priority'], reverse=True)
+    sorted_tokens = sorted(tokens, key=itemgetter('priority'), reverse=True)
     
     print("\nQueue After Automatic Sorting:")
     for i, t in enumerate(sorted_tokens, 1):
-        print(f"  T{str(i).zfill(3)} - {t['patient']:25} ({t['type']:10}) - Priority: {t['priority']}")
+        print(f"  {token_label(i)} - {t['patient']:25} ({t['type']:10}) - Priority: {t['priority']}")
     
     # 4. API Endpoints
     print_header("4. API ENDPOINTS")
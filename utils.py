@@ -1,5 +1,4 @@
 """Utility functions - random helpers I use throughout the project"""
-from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import random
 
@@ -7,37 +6,61 @@ import random
 TIME_FORMAT = "%H:%M"
 DATE_FORMAT = "%Y-%m-%d"
 DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+MINUTES_PER_DAY = 24 * 60
 
 
 def format_time(time_str: str) -> str:
     """Format time string nicely - handles both HH:MM and HH:MM:SS"""
     try:
-        if len(time_str.split(':')) == 3:
-            # Has seconds, strip them
-            return ':'.join(time_str.split(':')[:2])
+        if time_str.count(':') == 2:
+            # Has seconds, strip them (string ops only, no lists)
+            return time_str[:time_str.rindex(':')]
         return time_str
-    except:
-        return time_str  # return as-is if something goes wrong
+    except AttributeError:
+        return time_str  # not a string - return as-is
+
+
+def _to_minutes(time_str: str) -> int:
+    """Minutes since midnight for an HH:MM string (ValueError if invalid)"""
+    hours, minutes = map(int, time_str.split(':'))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"time out of range: {time_str}")
+    return hours * 60 + minutes
 
 
 def add_minutes(time_str: str, minutes: int) -> str:
-    """Add minutes to a time string (HH:MM format)"""
+    """Add minutes to a time string (HH:MM format), wrapping at midnight"""
     try:
-        # Parse the time
-        time_obj = datetime.strptime(time_str, TIME_FORMAT)
-        # Add minutes
-        new_time = time_obj + timedelta(minutes=minutes)
-        # Return formatted
-        return new_time.strftime(TIME_FORMAT)
+        # Plain integer math - no datetime parsing/formatting needed
+        total = (_to_minutes(time_str) + minutes) % MINUTES_PER_DAY
+        return f"{total // 60:02d}:{total % 60:02d}"
     except Exception as e:
         print(f"Error adding minutes: {e}")
         return time_str
 
 
+_PHONE_NUMBERS = range(7000000000, 10000000000)
+
+
 def generate_random_phone():
     """Generate a random 10-digit phone number for testing"""
+    return generate_random_phones(1)[0]
+
+
+def generate_random_phones(n: int) -> List[str]:
+    """Generate n random phone numbers - drawn in one random.choices call"""
     # Format: +91-XXXXXXXXXX (Indian format)
-    return f"+91-{random.randint(7000000000, 9999999999)}"
+    return [f"+91-{number}" for number in random.choices(_PHONE_NUMBERS, k=n)]
+
+
+# Token number strings (T001, T002, ...), built once - a slot's counter
+# never gets near 1000 in practice, larger numbers fall back to formatting
+_TOKEN_LABELS = tuple(f"T{number:03d}" for number in range(1000))
+
+
+def token_label(number: int) -> str:
+    """Token number string for a 1-based number (e.g. 7 -> "T007")"""
+    return _TOKEN_LABELS[number] if 0 <= number < 1000 else f"T{number:03d}"
 
 
 def calculate_queue_wait(position: int, avg_time: int = 10) -> int:
@@ -59,34 +82,46 @@ def calculate_queue_wait(position: int, avg_time: int = 10) -> int:
 def is_slot_time_valid(start_time: str, end_time: str) -> bool:
     """Check if slot times are valid (start < end)"""
     try:
-        start = datetime.strptime(start_time, TIME_FORMAT)
-        end = datetime.strptime(end_time, TIME_FORMAT)
-        return start < end
-    except:
+        return _to_minutes(start_time) < _to_minutes(end_time)
+    except (ValueError, AttributeError):
         return False
 
 
 # Some sample data generators for testing
+_PATIENT_NAMES = (
+    "Rajesh Kumar", "Priya Sharma", "Amit Patel",
+    "Sunita Reddy", "Vikram Singh", "Anjali Gupta",
+    "Manoj Verma", "Kavita Joshi", "Ravi Mehta",
+    "Sneha Desai", "Arjun Rao", "Pooja Nair"
+)
+_PATIENT_AGES = range(18, 81)
+
+
 def generate_patient_names() -> List[str]:
     """Returns a list of sample patient names for testing"""
-    return [
-        "Rajesh Kumar", "Priya Sharma", "Amit Patel", 
-        "Sunita Reddy", "Vikram Singh", "Anjali Gupta",
-        "Manoj Verma", "Kavita Joshi", "Ravi Mehta",
-        "Sneha Desai", "Arjun Rao", "Pooja Nair"
-    ]
+    return list(_PATIENT_NAMES)
 
 
 def generate_patient_data():
     """Generate random patient data for testing"""
-    names = generate_patient_names()
     return {
-        "name": random.choice(names),
+        "name": random.choice(_PATIENT_NAMES),
         "phone": generate_random_phone(),
-        "age": random.randint(18, 80)
+        "age": random.choice(_PATIENT_AGES)
     }
 
 
+def generate_patient_batch(n: int) -> List[Dict[str, Any]]:
+    """Generate n random patients - each field drawn for the whole batch at once"""
+    names = random.choices(_PATIENT_NAMES, k=n)
+    phones = generate_random_phones(n)
+    ages = random.choices(_PATIENT_AGES, k=n)
+    return [
+        {"name": name, "phone": phone, "age": age}
+        for name, phone, age in zip(names, phones, ages)
+    ]
+
+
 # Debugging helpers
 def print_divider(char="=", length=70):
     """Print a divider line - useful for console output"""